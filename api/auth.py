@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional, Dict, Any
 from datetime import datetime
+import asyncio
+import hashlib
+import time
 from services.auth_service import auth_service
 from models.user import User
+from models.database import get_db
+from models.enterprise import APIKey
+from sqlalchemy.orm import Session
 from utils.logging import get_logger
+from utils.health import health_response
 from utils.security import security_utils
+from utils.config import get_settings
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -23,8 +31,8 @@ class UserRegistration(BaseModel):
     bio: Optional[str] = None
     consent_given: bool = False
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "email": "researcher@university.edu",
                 "password": "SecurePass123!",
@@ -36,18 +44,20 @@ class UserRegistration(BaseModel):
                 "consent_given": True
             }
         }
+    )
 
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "email": "researcher@university.edu",
                 "password": "SecurePass123!"
             }
         }
+    )
 
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
@@ -63,8 +73,8 @@ class APIKeyRequest(BaseModel):
     key_name: str
     permissions: Optional[Dict[str, Any]] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "key_name": "Analysis API Key",
                 "permissions": {
@@ -74,6 +84,7 @@ class APIKeyRequest(BaseModel):
                 }
             }
         }
+    )
 
 class UserResponse(BaseModel):
     id: int
@@ -97,14 +108,164 @@ class AuthResponse(BaseModel):
     token_type: str
     session_id: Optional[str] = None
 
+def _prune_expiring_cache(cache: Dict[str, tuple], now: float, maxsize: int):
+    """Make room in a {key: (expires_at, value)} cache: drop expired entries, then the oldest"""
+    if len(cache) < maxsize:
+        return
+    for key in [key for key, (expires_at, _) in cache.items() if expires_at <= now]:
+        del cache[key]
+    if len(cache) >= maxsize:
+        del cache[next(iter(cache))]
+
+# Authenticated users keyed by SHA-256 of the bearer token: token_hash -> (expires_at, user)
+_USER_CACHE_TTL = 30  # seconds
+_USER_CACHE_MAXSIZE = 50000
+_user_cache: Dict[str, tuple] = {}
+_user_lookups: Dict[str, asyncio.Future] = {}
+
+# Cached users are only served to safe (read-only) requests, so a deactivated account
+# cannot write on a worker whose cache still holds it
+_CACHEABLE_METHODS = frozenset({"GET", "HEAD"})
+
+# Read from the table, not sa_inspect(User): inspecting the mapper configures every mapper
+# at import time, which fails while some relationships are still disabled
+_USER_COLUMNS = tuple(User.__table__.columns.keys())
+
+class UserSnapshot:
+    """Column values of a User, independent of any DB session and safe to share across requests"""
+    
+    to_dict = User.to_dict
+    
+    def __init__(self, user: User):
+        for key in _USER_COLUMNS:
+            setattr(self, key, getattr(user, key))
+
+# Service account subjects resolve to synthetic users without a DB lookup. The synthetic
+# user has no row in users, so it is only accepted by get_current_user_or_service_account
+# (read-only routes that never write user_id); get_current_user rejects it
+SERVICE_ACCOUNTS = frozenset(get_settings().SERVICE_ACCOUNTS)
+_service_users: Dict[str, User] = {}
+service_account_auth_count = 0
+
+def _get_service_user(subject: str) -> User:
+    user = _service_users.get(subject)
+    if user is None:
+        user = User(id=-1, email=subject, is_active=True, is_verified=True)
+        _service_users[subject] = user
+    return user
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def invalidate_cached_user(token: str):
+    """Drop a token from the authenticated user cache (e.g. on logout)"""
+    _user_cache.pop(_token_cache_key(token), None)
+
+async def _get_user_for_token(
+    token: str,
+    use_cache: bool = True,
+    allow_service_account: bool = False
+) -> UserSnapshot:
+    """Resolve token to user, serving repeat read requests from a short-lived cache"""
+    key = _token_cache_key(token)
+    now = time.time()
+    
+    cached = _user_cache.get(key)
+    if cached:
+        if now >= cached[0]:
+            del _user_cache[key]
+        elif use_cache:
+            # Logout on another worker only clears that worker's cache; the blacklist is shared
+            if await security_utils.is_token_blacklisted_async(token):
+                del _user_cache[key]
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Token has been revoked"
+                )
+            return cached[1]
+    
+    payload = security_utils.verify_token(token)
+    
+    if (
+        payload
+        and payload.get("type") == "access"
+        and payload.get("sub") in SERVICE_ACCOUNTS
+        and not await security_utils.is_token_blacklisted_async(token)
+    ):
+        if not allow_service_account:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Service accounts cannot access this endpoint"
+            )
+        global service_account_auth_count
+        service_account_auth_count += 1
+        return _get_service_user(payload["sub"])
+    
+    # Concurrent misses for the same token share a single lookup
+    pending = _user_lookups.get(key)
+    if pending:
+        return await asyncio.shield(pending)
+    
+    lookup = asyncio.ensure_future(_load_user_snapshot(token))
+    _user_lookups[key] = lookup
+    try:
+        user = await lookup
+    finally:
+        _user_lookups.pop(key, None)
+    
+    # Never cache past the token's own expiry
+    if payload and payload.get("exp"):
+        expires_at = min(now + _USER_CACHE_TTL, float(payload["exp"]))
+        _prune_expiring_cache(_user_cache, now, _USER_CACHE_MAXSIZE)
+        _user_cache[key] = (expires_at, user)
+    
+    return user
+
+async def _load_user_snapshot(token: str) -> UserSnapshot:
+    # The auth service closes its session, so the loaded User is detached; copy its columns
+    return UserSnapshot(await auth_service.get_current_user(token))
+
 # Dependency to get current user
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
     """Get current authenticated user"""
     try:
         token = credentials.credentials
-        return await auth_service.get_current_user(token)
+        return await _get_user_for_token(token, use_cache=request.method in _CACHEABLE_METHODS)
+    except HTTPException as e:
+        if e.status_code == status.HTTP_403_FORBIDDEN:
+            raise
+        logger.error("Authentication error: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    except Exception as e:
+        logger.error("Authentication error: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+# Dependency for read-only routes that service accounts (e.g. probes) may also call
+async def get_current_user_or_service_account(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    """Get current authenticated user, accepting service account tokens"""
+    try:
+        token = credentials.credentials
+        return await _get_user_for_token(
+            token,
+            use_cache=request.method in _CACHEABLE_METHODS,
+            allow_service_account=True
+        )
     except Exception as e:
-        logger.error(f"Authentication error: {str(e)}")
+        logger.error("Authentication error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -112,42 +273,83 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
 
 # Dependency to get current user (optional)
-async def get_current_user_optional(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Optional[User]:
+async def get_current_user_optional(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Optional[User]:
     """Get current authenticated user (optional)"""
     try:
         if not credentials:
             return None
         token = credentials.credentials
-        return await auth_service.get_current_user(token)
+        return await _get_user_for_token(token, use_cache=request.method in _CACHEABLE_METHODS)
     except Exception:
         return None
 
-# Rate limiting dependency
-async def rate_limit_check(request: Request):
-    """Check rate limit for authentication endpoints"""
-    from utils.config import get_settings
-    settings = get_settings()
+# Rate-limit keys already known to be over the limit: key -> (reset_timestamp, reset_time)
+# Lets repeated requests from a flooding client be rejected without a Redis round trip.
+_RATE_LIMITED_MAXSIZE = 10000
+_rate_limited_clients: Dict[str, tuple] = {}
+
+def _rate_limit_exceeded(reset_time: datetime) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Rate limit exceeded. Please try again later.",
+        headers={"Retry-After": str(reset_time)}
+    )
+
+async def _enforce_rate_limit(key: str, limit: int, window: int):
+    """Raise 429 if the key is over its limit"""
+    now = time.time()
     
-    # Skip rate limiting if disabled
-    if not settings.ENABLE_RATE_LIMITING:
-        return
-        
-    client_ip = request.client.host
-    rate_limit_result = security_utils.check_rate_limit(f"auth:{client_ip}", limit=10, window=300)  # 10 requests per 5 minutes
+    cached = _rate_limited_clients.get(key)
+    if cached:
+        if now < cached[0]:
+            raise _rate_limit_exceeded(cached[1])
+        del _rate_limited_clients[key]
+    
+    rate_limit_result = await security_utils.check_rate_limit(key, limit=limit, window=window)
     
     if not rate_limit_result["allowed"]:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Rate limit exceeded. Please try again later.",
-            headers={"Retry-After": str(rate_limit_result["reset_time"])}
-        )
+        reset_time = rate_limit_result["reset_time"]
+        _prune_expiring_cache(_rate_limited_clients, now, _RATE_LIMITED_MAXSIZE)
+        _rate_limited_clients[key] = (now + (reset_time - datetime.utcnow()).total_seconds(), reset_time)
+        raise _rate_limit_exceeded(reset_time)
+
+# Rate limiting dependencies
+async def rate_limit_by_ip(request: Request):
+    """Check rate limit for unauthenticated endpoints by client IP"""
+    if not get_settings().ENABLE_RATE_LIMITING:
+        return
+    
+    await _enforce_rate_limit(f"auth:{request.client.host}", limit=10, window=300)  # 10 requests per 5 minutes
+
+async def rate_limit_by_user(request: Request):
+    """Check rate limit for refresh by the user the refresh token belongs to"""
+    if not get_settings().ENABLE_RATE_LIMITING:
+        return
+    
+    # FastAPI has already read the body, so this does not consume the stream
+    try:
+        body = await request.json()
+        payload = security_utils.verify_token(body.get("refresh_token") or "")
+    except Exception:
+        payload = None
+    
+    if not payload or payload.get("type") != "refresh" or not payload.get("sub"):
+        # Not a usable refresh token - fall back to the stricter IP limit
+        await rate_limit_by_ip(request)
+        return
+    
+    # Per-user quota so clients behind a shared NAT don't throttle each other
+    await _enforce_rate_limit(f"auth:user:{payload['sub']}", limit=60, window=60)
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegistration, request: Request, _: None = Depends(rate_limit_check)):
+async def register(user_data: UserRegistration, request: Request, _: None = Depends(rate_limit_by_ip)):
     """Register a new user"""
     try:
         # Log registration attempt
-        logger.info(f"User registration attempt: {user_data.email}")
+        logger.info("User registration attempt: %s", user_data.email)
         
         # Validate GDPR consent
         if not user_data.consent_given:
@@ -157,28 +359,29 @@ async def register(user_data: UserRegistration, request: Request, _: None = Depe
             )
         
         # Call auth service
-        result = await auth_service.register_user(user_data.dict())
+        result = await auth_service.register_user(user_data.model_dump())
         
         # Log successful registration
-        logger.info(f"User registered successfully: {user_data.email}")
+        logger.info("User registered successfully: %s", user_data.email)
         
-        return AuthResponse(**result)
+        # Validated once against response_model by FastAPI
+        return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Registration error: {str(e)}")
+        logger.exception("Registration error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during registration"
         )
 
 @router.post("/login", response_model=AuthResponse)
-async def login(user_credentials: UserLogin, request: Request, _: None = Depends(rate_limit_check)):
+async def login(user_credentials: UserLogin, request: Request, _: None = Depends(rate_limit_by_ip)):
     """Authenticate user and return tokens"""
     try:
         # Log login attempt
-        logger.info(f"User login attempt: {user_credentials.email}")
+        logger.info("User login attempt: %s", user_credentials.email)
         
         # Get client IP
         client_ip = request.client.host
@@ -191,21 +394,22 @@ async def login(user_credentials: UserLogin, request: Request, _: None = Depends
         )
         
         # Log successful login
-        logger.info(f"User logged in successfully: {user_credentials.email}")
+        logger.info("User logged in successfully: %s", user_credentials.email)
         
-        return AuthResponse(**result)
+        # Validated once against response_model by FastAPI
+        return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Login error: {str(e)}")
+        logger.exception("Login error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during login"
         )
 
 @router.post("/refresh")
-async def refresh_token(refresh_request: RefreshTokenRequest, _: None = Depends(rate_limit_check)):
+async def refresh_token(refresh_request: RefreshTokenRequest, _: None = Depends(rate_limit_by_user)):
     """Refresh access token"""
     try:
         result = await auth_service.refresh_token(refresh_request.refresh_token)
@@ -217,7 +421,7 @@ async def refresh_token(refresh_request: RefreshTokenRequest, _: None = Depends(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Token refresh error: {str(e)}")
+        logger.exception("Token refresh error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during token refresh"
@@ -229,11 +433,8 @@ async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
         
-        # Extract session ID from token if available
-        payload = security_utils.verify_token(token)
-        session_id = payload.get("session_id") if payload else None
-        
-        result = await auth_service.logout_user(token, session_id)
+        result = await auth_service.logout_user(token)
+        invalidate_cached_user(token)
         
         logger.info("User logged out successfully")
         
@@ -242,7 +443,7 @@ async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Logout error: {str(e)}")
+        logger.exception("Logout error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during logout"
@@ -251,29 +452,30 @@ async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
-    return UserResponse(**current_user.to_dict())
+    # Validated once against response_model by FastAPI
+    return current_user.to_dict()
 
 @router.post("/password/reset-request")
-async def request_password_reset(reset_request: PasswordResetRequest, _: None = Depends(rate_limit_check)):
+async def request_password_reset(reset_request: PasswordResetRequest, _: None = Depends(rate_limit_by_ip)):
     """Request password reset"""
     try:
         result = await auth_service.reset_password_request(reset_request.email)
         
-        logger.info(f"Password reset requested for: {reset_request.email}")
+        logger.info("Password reset requested for: %s", reset_request.email)
         
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Password reset request error: {str(e)}")
+        logger.exception("Password reset request error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
 @router.post("/password/reset")
-async def reset_password(reset_data: PasswordReset, _: None = Depends(rate_limit_check)):
+async def reset_password(reset_data: PasswordReset, _: None = Depends(rate_limit_by_ip)):
     """Reset password using reset token"""
     try:
         result = await auth_service.reset_password(reset_data.token, reset_data.new_password)
@@ -285,7 +487,7 @@ async def reset_password(reset_data: PasswordReset, _: None = Depends(rate_limit
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Password reset error: {str(e)}")
+        logger.exception("Password reset error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -304,71 +506,67 @@ async def create_api_key(
             api_key_request.permissions
         )
         
-        logger.info(f"API key created for user {current_user.id}: {api_key_request.key_name}")
+        logger.info("API key created for user %s: %s", current_user.id, api_key_request.key_name)
         
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"API key creation error: {str(e)}")
+        logger.exception("API key creation error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
 @router.get("/api-keys")
-async def list_api_keys(current_user: User = Depends(get_current_user)):
+async def list_api_keys(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """List user's API keys"""
     try:
         # Get user's API keys from database
-        from models.database import get_db
-        from models.enterprise import APIKey
         
-        db = next(get_db())
-        api_keys = db.query(APIKey).filter(APIKey.user_id == current_user.id).all()
+        api_keys = await asyncio.to_thread(
+            lambda: db.query(APIKey).filter(APIKey.user_id == current_user.id).all()
+        )
         
         return {
             "api_keys": [key.to_dict() for key in api_keys]
         }
         
     except Exception as e:
-        logger.error(f"API key listing error: {str(e)}")
+        logger.exception("API key listing error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
 @router.delete("/api-key/{key_id}")
-async def delete_api_key(key_id: int, current_user: User = Depends(get_current_user)):
+async def delete_api_key(key_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """Delete API key"""
     try:
-        from models.database import get_db
-        from models.enterprise import APIKey
-        
-        db = next(get_db())
-        api_key = db.query(APIKey).filter(
-            APIKey.id == key_id,
-            APIKey.user_id == current_user.id
-        ).first()
-        
-        if not api_key:
+        # Soft delete in a single UPDATE; no matched row means not found / not owned
+        def _deactivate_api_key() -> int:
+            updated = db.query(APIKey).filter(
+                APIKey.id == key_id,
+                APIKey.user_id == current_user.id
+            ).update({APIKey.is_active: False}, synchronize_session=False)
+            db.commit()
+            return updated
+        
+        if not await asyncio.to_thread(_deactivate_api_key):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="API key not found"
             )
         
-        api_key.is_active = False
-        db.commit()
-        
-        logger.info(f"API key deleted for user {current_user.id}: {key_id}")
+        logger.info("API key deleted for user %s: %s", current_user.id, key_id)
         
         return {"message": "API key deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"API key deletion error: {str(e)}")
+        logger.exception("API key deletion error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -377,8 +575,4 @@ async def delete_api_key(key_id: int, current_user: User = Depends(get_current_u
 @router.get("/health")
 async def auth_health_check():
     """Health check for authentication service"""
-    return {
-        "service": "authentication",
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    return health_response("authentication", service_account_auths=service_account_auth_count)
\ No newline at end of file
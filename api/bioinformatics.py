@@ -1,16 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+import asyncio
+import io
 import json
 
 from services.bioinformatics_service import bioinformatics_service
-from api.auth import get_current_user
+from api.auth import get_current_user, get_current_user_or_service_account
 from models.user import User
+from models.database import get_db
+from models.bioinformatics import Dataset, GeneAnnotation, AnalysisJob, AnalysisResult, ExpressionData
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from utils.logging import get_logger
+from utils.health import health_response
 from utils.security import security_utils
 
+# orjson parses and serializes several times faster; its JSONDecodeError subclasses
+# json.JSONDecodeError, and OPT_NON_STR_KEYS keeps json.dumps' handling of int keys
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 logger = get_logger(__name__)
 router = APIRouter()
 
@@ -22,8 +41,8 @@ class DatasetMetadata(BaseModel):
     tissue_type: Optional[str] = None
     experiment_type: Optional[str] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "name": "Breast Cancer RNA-seq",
                 "description": "RNA-seq data from breast cancer patients",
@@ -32,32 +51,46 @@ class DatasetMetadata(BaseModel):
                 "experiment_type": "RNA-seq"
             }
         }
+    )
 
 class PCARequest(BaseModel):
     dataset_id: int
     n_components: int = Field(default=2, ge=2, le=10)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "dataset_id": 1,
                 "n_components": 2
             }
         }
+    )
 
 class ClusteringRequest(BaseModel):
     dataset_id: int
     method: str = Field(default="kmeans", pattern="^(kmeans|hierarchical)$")
     n_clusters: int = Field(default=3, ge=2, le=20)
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "dataset_id": 1,
                 "method": "kmeans",
                 "n_clusters": 3
             }
         }
+    )
+
+class GeneInfoBatchRequest(BaseModel):
+    gene_ids: List[str] = Field(..., min_length=1, max_length=500)
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "gene_ids": ["ENSG00000141510", "ENSG00000012048"]
+            }
+        }
+    )
 
 class DatasetResponse(BaseModel):
     id: int
@@ -84,6 +117,40 @@ class AnalysisJobResponse(BaseModel):
     created_at: Optional[datetime]
     completed_at: Optional[datetime]
 
+# Gene annotations are effectively immutable, so cache them for a day
+GENE_INFO_CACHE_TTL = 86400
+
+def _gene_cache_key(gene_id: str) -> str:
+    return f"gene:{gene_id}"
+
+async def _get_cached_gene_info(gene_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch cached gene annotations in a single MGET; cache failures count as misses"""
+    redis_client = security_utils.async_redis_client
+    if not redis_client:
+        return {}
+    try:
+        values = await redis_client.mget([_gene_cache_key(gene_id) for gene_id in gene_ids])
+    except Exception:
+        return {}
+    return {
+        gene_id: _json_loads(value)
+        for gene_id, value in zip(gene_ids, values)
+        if value
+    }
+
+async def _cache_gene_info(annotations: Dict[str, Dict[str, Any]]):
+    """Store gene annotations in one pipelined round trip"""
+    redis_client = security_utils.async_redis_client
+    if not redis_client or not annotations:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for gene_id, annotation in annotations.items():
+                pipe.setex(_gene_cache_key(gene_id), GENE_INFO_CACHE_TTL, _json_dumps(annotation))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Could not cache gene annotations: %s", e)
+
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
 async def upload_dataset(
     file: UploadFile = File(...),
@@ -94,8 +161,8 @@ async def upload_dataset(
     try:
         # Parse metadata
         try:
-            metadata_dict = json.loads(metadata)
-            dataset_metadata = DatasetMetadata(**metadata_dict)
+            metadata_dict = _json_loads(metadata)
+            dataset_metadata = DatasetMetadata.model_validate(metadata_dict)
         except json.JSONDecodeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -114,25 +181,25 @@ async def upload_dataset(
                 detail="No file provided"
             )
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Validate file size
-        if len(file_content) == 0:
+        # Validate file size; the upload is already spooled, so hand the file
+        # object to the service rather than reading it into memory
+        file.file.seek(0, io.SEEK_END)
+        if file.file.tell() == 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Empty file"
             )
+        file.file.seek(0)
         
         # Upload dataset
-        result = await bioinformatics_service.upload_dataset(
+        result = await bioinformatics_service.upload_dataset_stream(
             user_id=current_user.id,
-            file_data=file_content,
+            fileobj=file.file,
             file_name=file.filename,
-            metadata=dataset_metadata.dict()
+            metadata=dataset_metadata.model_dump()
         )
         
-        logger.info(f"Dataset uploaded by user {current_user.id}: {file.filename}")
+        logger.info("Dataset uploaded by user %s: %s", current_user.id, file.filename)
         
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
@@ -142,7 +209,7 @@ async def upload_dataset(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error uploading dataset: {str(e)}")
+        logger.exception("Error uploading dataset: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during dataset upload"
@@ -165,7 +232,7 @@ async def list_datasets(
         return result
         
     except Exception as e:
-        logger.error(f"Error listing datasets: {str(e)}")
+        logger.exception("Error listing datasets: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -174,18 +241,17 @@ async def list_datasets(
 @router.get("/datasets/{dataset_id}")
 async def get_dataset(
     dataset_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get dataset details"""
     try:
-        from models.database import get_db
-        from models.bioinformatics import Dataset
-        
-        db = next(get_db())
-        dataset = db.query(Dataset).filter(
-            Dataset.id == dataset_id,
-            Dataset.user_id == current_user.id
-        ).first()
+        dataset = await asyncio.to_thread(
+            lambda: db.query(Dataset).filter(
+                Dataset.id == dataset_id,
+                Dataset.user_id == current_user.id
+            ).first()
+        )
         
         if not dataset:
             raise HTTPException(
@@ -198,7 +264,7 @@ async def get_dataset(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting dataset: {str(e)}")
+        logger.exception("Error getting dataset: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -216,14 +282,14 @@ async def perform_eda(
             user_id=current_user.id
         )
         
-        logger.info(f"EDA performed by user {current_user.id} on dataset {dataset_id}")
+        logger.info("EDA performed by user %s on dataset %s", current_user.id, dataset_id)
         
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error performing EDA: {str(e)}")
+        logger.exception("Error performing EDA: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during EDA"
@@ -242,14 +308,14 @@ async def perform_pca(
             n_components=pca_request.n_components
         )
         
-        logger.info(f"PCA performed by user {current_user.id} on dataset {pca_request.dataset_id}")
+        logger.info("PCA performed by user %s on dataset %s", current_user.id, pca_request.dataset_id)
         
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error performing PCA: {str(e)}")
+        logger.exception("Error performing PCA: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during PCA"
@@ -269,14 +335,14 @@ async def perform_clustering(
             n_clusters=clustering_request.n_clusters
         )
         
-        logger.info(f"Clustering performed by user {current_user.id} on dataset {clustering_request.dataset_id}")
+        logger.info("Clustering performed by user %s on dataset %s", current_user.id, clustering_request.dataset_id)
         
         return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error performing clustering: {str(e)}")
+        logger.exception("Error performing clustering: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during clustering"
@@ -301,7 +367,7 @@ async def list_analysis_jobs(
         return result
         
     except Exception as e:
-        logger.error(f"Error listing analysis jobs: {str(e)}")
+        logger.exception("Error listing analysis jobs: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -324,7 +390,7 @@ async def get_analysis_job(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting analysis job: {str(e)}")
+        logger.exception("Error getting analysis job: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -333,42 +399,49 @@ async def get_analysis_job(
 @router.delete("/datasets/{dataset_id}")
 async def delete_dataset(
     dataset_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Delete dataset"""
     try:
-        from models.database import get_db
-        from models.bioinformatics import Dataset, AnalysisJob, ExpressionData
-        
-        db = next(get_db())
-        
-        # Check if dataset exists and belongs to user
-        dataset = db.query(Dataset).filter(
-            Dataset.id == dataset_id,
-            Dataset.user_id == current_user.id
-        ).first()
-        
-        if not dataset:
+        # Owner-scoped DELETEs in one transaction, children first (the foreign keys do not
+        # cascade); no SELECT up front, a zero rowcount on datasets means not found
+        def _delete_dataset_rows() -> int:
+            owned = select(Dataset.id).where(
+                Dataset.id == dataset_id,
+                Dataset.user_id == current_user.id
+            )
+            owned_jobs = select(AnalysisJob.id).where(AnalysisJob.dataset_id.in_(owned))
+            db.query(ExpressionData).filter(
+                ExpressionData.dataset_id.in_(owned)
+            ).delete(synchronize_session=False)
+            db.query(AnalysisResult).filter(
+                AnalysisResult.analysis_job_id.in_(owned_jobs)
+            ).delete(synchronize_session=False)
+            db.query(AnalysisJob).filter(
+                AnalysisJob.dataset_id.in_(owned)
+            ).delete(synchronize_session=False)
+            deleted = db.query(Dataset).filter(
+                Dataset.id == dataset_id,
+                Dataset.user_id == current_user.id
+            ).delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        
+        if not await asyncio.to_thread(_delete_dataset_rows):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Dataset not found"
             )
         
-        # Delete related data
-        db.query(ExpressionData).filter(ExpressionData.dataset_id == dataset_id).delete()
-        db.query(AnalysisJob).filter(AnalysisJob.dataset_id == dataset_id).delete()
-        db.query(Dataset).filter(Dataset.id == dataset_id).delete()
-        
-        db.commit()
-        
-        logger.info(f"Dataset {dataset_id} deleted by user {current_user.id}")
+        logger.info("Dataset %s deleted by user %s", dataset_id, current_user.id)
         
         return {"message": "Dataset deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting dataset: {str(e)}")
+        logger.exception("Error deleting dataset: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -377,20 +450,20 @@ async def delete_dataset(
 @router.post("/datasets/{dataset_id}/validate")
 async def validate_dataset(
     dataset_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Validate dataset structure and quality"""
     try:
-        from models.database import get_db
-        from models.bioinformatics import Dataset
-        
-        db = next(get_db())
-        dataset = db.query(Dataset).filter(
-            Dataset.id == dataset_id,
-            Dataset.user_id == current_user.id
-        ).first()
+        # Ownership probe only needs the key (served from the (user_id, id) index)
+        dataset_exists = await asyncio.to_thread(
+            lambda: db.query(Dataset.id).filter(
+                Dataset.id == dataset_id,
+                Dataset.user_id == current_user.id
+            ).scalar()
+        )
         
-        if not dataset:
+        if not dataset_exists:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Dataset not found"
@@ -398,13 +471,18 @@ async def validate_dataset(
         
         # Load and validate data
         df = await bioinformatics_service._load_expression_data(dataset_id)
-        validation_result = bioinformatics_service._validate_expression_data(df)
-        quality_metrics = bioinformatics_service._calculate_quality_metrics(df)
+        validation_result = await asyncio.to_thread(bioinformatics_service._validate_expression_data, df)
+        quality_metrics = await asyncio.to_thread(bioinformatics_service._calculate_quality_metrics, df)
         
         # Update dataset with new metrics
-        dataset.data_quality_score = quality_metrics["quality_score"]
-        dataset.missing_values_count = quality_metrics["missing_values"]
-        db.commit()
+        def _update_quality_metrics():
+            db.query(Dataset).filter(Dataset.id == dataset_id).update({
+                Dataset.data_quality_score: quality_metrics["quality_score"],
+                Dataset.missing_values_count: quality_metrics["missing_values"]
+            }, synchronize_session=False)
+            db.commit()
+        
+        await asyncio.to_thread(_update_quality_metrics)
         
         return {
             "dataset_id": dataset_id,
@@ -415,7 +493,7 @@ async def validate_dataset(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error validating dataset: {str(e)}")
+        logger.exception("Error validating dataset: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -424,17 +502,20 @@ async def validate_dataset(
 @router.get("/gene-info/{gene_id}")
 async def get_gene_info(
     gene_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_or_service_account),
+    db: Session = Depends(get_db)
 ):
     """Get gene annotation information"""
     try:
-        from models.database import get_db
-        from models.bioinformatics import GeneAnnotation
-        
-        db = next(get_db())
-        gene_annotation = db.query(GeneAnnotation).filter(
-            GeneAnnotation.gene_id == gene_id
-        ).first()
+        cached = await _get_cached_gene_info([gene_id])
+        if gene_id in cached:
+            return cached[gene_id]
+        
+        gene_annotation = await asyncio.to_thread(
+            lambda: db.query(GeneAnnotation).filter(
+                GeneAnnotation.gene_id == gene_id
+            ).first()
+        )
         
         if not gene_annotation:
             # Return basic information if not found in database
@@ -444,10 +525,48 @@ async def get_gene_info(
                 "available": False
             }
         
-        return gene_annotation.to_dict()
+        annotation = gene_annotation.to_dict()
+        await _cache_gene_info({gene_id: annotation})
+        
+        return annotation
         
     except Exception as e:
-        logger.error(f"Error getting gene info: {str(e)}")
+        logger.exception("Error getting gene info: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+@router.post("/gene-info/batch")
+async def get_gene_info_batch(
+    batch_request: GeneInfoBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get gene annotation information for many genes at once"""
+    try:
+        gene_ids = list(dict.fromkeys(batch_request.gene_ids))
+        genes = await _get_cached_gene_info(gene_ids)
+        
+        # Resolve all cache misses with a single IN query
+        missing_ids = [gene_id for gene_id in gene_ids if gene_id not in genes]
+        if missing_ids:
+            annotations = await asyncio.to_thread(
+                lambda: db.query(GeneAnnotation).filter(
+                    GeneAnnotation.gene_id.in_(missing_ids)
+                ).all()
+            )
+            loaded = {annotation.gene_id: annotation.to_dict() for annotation in annotations}
+            await _cache_gene_info(loaded)
+            genes.update(loaded)
+        
+        return {
+            "genes": genes,
+            "not_found": [gene_id for gene_id in gene_ids if gene_id not in genes]
+        }
+        
+    except Exception as e:
+        logger.exception("Error getting gene info batch: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -456,8 +575,4 @@ async def get_gene_info(
 @router.get("/health")
 async def bioinformatics_health_check():
     """Health check for bioinformatics service"""
-    return {
-        "service": "bioinformatics",
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    return health_response("bioinformatics")
\ No newline at end of file
@@ -2,24 +2,46 @@
 Enterprise API endpoints for team collaboration and API management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, EmailStr, Field, ValidationError
 from datetime import datetime
+from functools import wraps
+import json
 
 from services.enterprise_service import enterprise_service
-from services.auth_service import auth_service
-from services.auth_service import AuthService
+from api.auth import get_current_user
 from models.user import User
+from models.enterprise import TeamRole
+from models.database import get_db
+from sqlalchemy.orm import Session
+from utils.logging import get_logger
 
+# orjson parses several times faster; its JSONDecodeError subclasses ValueError
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = get_logger(__name__)
 router = APIRouter()
-security = HTTPBearer()
 
-# Dependency to get current user
-async def get_current_user(token: str = Depends(security)):
-    """Get current user from JWT token"""
-    return await auth_service.get_current_user(token.credentials)
+def handle_service_errors(func):
+    """Let HTTPExceptions through and turn any other service error into a 500"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception("Enterprise endpoint %s failed: %s", func.__name__, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+    return wrapper
 
 # Request/Response Models
 class TeamCreateRequest(BaseModel):
@@ -28,17 +50,19 @@ class TeamCreateRequest(BaseModel):
     team_type: str = Field(default="research", max_length=50)
 
 class TeamInviteRequest(BaseModel):
-    user_email: str = Field(..., pattern=r'^[^@]+@[^@]+\.[^@]+$')
-    role: str = Field(..., pattern=r'^(owner|admin|member|viewer)$')
+    user_email: EmailStr
+    role: TeamRole
 
 class WorkspaceCreateRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     description: str = Field(default="", max_length=500)
 
-class ShareAnalysisRequest(BaseModel):
+class ShareAnalysisMetadata(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: str = Field(default="", max_length=500)
     analysis_type: str = Field(..., min_length=1, max_length=100)
+
+class ShareAnalysisRequest(ShareAnalysisMetadata):
     analysis_results: Dict[str, Any]
 
 class APIKeyCreateRequest(BaseModel):
@@ -51,273 +75,339 @@ class WorkflowExecuteRequest(BaseModel):
     inputs: Dict[str, Any] = Field(default={})
     custom_parameters: Dict[str, Any] = Field(default={})
 
+class TeamMemberResponse(BaseModel):
+    user_id: int
+    email: str
+    full_name: Optional[str] = None
+    role: str
+    joined_at: str
+    is_active: bool
+
+class WorkspaceResponse(BaseModel):
+    workspace_id: int
+    name: str
+    description: Optional[str] = None
+    creator_id: int
+    created_at: str
+    analysis_count: int
+
+class SharedAnalysisSummaryResponse(BaseModel):
+    analysis_id: int
+    title: str
+    description: Optional[str] = None
+    analysis_type: str
+    created_by: Optional[str] = None
+    created_at: str
+    has_results: bool
+
+class APIKeyResponse(BaseModel):
+    api_key_id: int
+    name: str
+    permissions: Any = None
+    created_at: str
+    expires_at: Optional[str] = None
+    last_used_at: Optional[str] = None
+
+class TeamActivityResponse(BaseModel):
+    type: str
+    user: Optional[str] = None
+    title: str
+    analysis_type: str
+    timestamp: str
+    resource_id: int
+
+class TeamActivityPageResponse(BaseModel):
+    items: List[TeamActivityResponse]
+    next_cursor: Optional[str] = None
+
+class TeamDashboardResponse(BaseModel):
+    members: List[TeamMemberResponse]
+    workspaces: List[WorkspaceResponse]
+    usage: Dict[str, Any]
+    activity: List[TeamActivityResponse]
+
 # Team Management Endpoints
 @router.post("/teams", response_model=Dict[str, Any])
+@handle_service_errors
 async def create_team(
     request: TeamCreateRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Create a new team"""
-    try:
-        result = await enterprise_service.create_team(
-            creator_id=current_user.id,
-            team_name=request.name,
-            description=request.description,
-            team_type=request.team_type
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.create_team(
+        db=db,
+        creator_id=current_user.id,
+        team_name=request.name,
+        description=request.description,
+        team_type=request.team_type
+    )
+    return result
 
 @router.post("/teams/{team_id}/invite", response_model=Dict[str, Any])
+@handle_service_errors
 async def invite_team_member(
     team_id: int,
     request: TeamInviteRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Invite a user to join a team"""
-    try:
-        from models.enterprise import TeamRole
-        role = TeamRole(request.role)
-        
-        result = await enterprise_service.invite_team_member(
-            team_id=team_id,
-            inviter_id=current_user.id,
-            user_email=request.user_email,
-            role=role
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.invite_team_member(
+        db=db,
+        team_id=team_id,
+        inviter_id=current_user.id,
+        user_email=request.user_email,
+        role=request.role
+    )
+    return result
 
-@router.get("/teams/{team_id}/members", response_model=List[Dict[str, Any]])
+@router.get("/teams/{team_id}/members", response_model=List[TeamMemberResponse], deprecated=True, response_model_exclude_none=True)
+@handle_service_errors
 async def get_team_members(
     team_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get team members"""
-    try:
-        result = await enterprise_service.get_team_members(
-            team_id=team_id,
-            requester_id=current_user.id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.get_team_members(
+        db=db,
+        team_id=team_id,
+        requester_id=current_user.id
+    )
+    return result
 
 # Workspace Management Endpoints
 @router.post("/teams/{team_id}/workspaces", response_model=Dict[str, Any])
+@handle_service_errors
 async def create_workspace(
     team_id: int,
     request: WorkspaceCreateRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Create a new workspace"""
-    try:
-        result = await enterprise_service.create_workspace(
-            team_id=team_id,
-            creator_id=current_user.id,
-            name=request.name,
-            description=request.description
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.create_workspace(
+        db=db,
+        team_id=team_id,
+        creator_id=current_user.id,
+        name=request.name,
+        description=request.description
+    )
+    return result
 
-@router.get("/teams/{team_id}/workspaces", response_model=List[Dict[str, Any]])
+@router.get("/teams/{team_id}/workspaces", response_model=List[WorkspaceResponse], deprecated=True, response_model_exclude_none=True)
+@handle_service_errors
 async def get_team_workspaces(
     team_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get workspaces for a team"""
-    try:
-        result = await enterprise_service.get_team_workspaces(
-            team_id=team_id,
-            user_id=current_user.id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.get_team_workspaces(
+        db=db,
+        team_id=team_id,
+        user_id=current_user.id
+    )
+    return result
 
 # Shared Analysis Endpoints
-@router.post("/teams/{team_id}/workspaces/{workspace_id}/analyses", response_model=Dict[str, Any])
+# analysis_results can be megabytes; the body is parsed once and only the small
+# metadata fields go through Pydantic (the schema is still published for docs)
+@router.post(
+    "/teams/{team_id}/workspaces/{workspace_id}/analyses",
+    response_model=Dict[str, Any],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ShareAnalysisRequest.model_json_schema()}}
+        }
+    }
+)
+@handle_service_errors
 async def share_analysis(
     team_id: int,
     workspace_id: int,
-    request: ShareAnalysisRequest,
-    current_user: User = Depends(get_current_user)
+    http_request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Share analysis results with team"""
     try:
-        result = await enterprise_service.share_analysis(
-            user_id=current_user.id,
-            team_id=team_id,
-            workspace_id=workspace_id,
-            analysis_type=request.analysis_type,
-            analysis_results=request.analysis_results,
-            title=request.title,
-            description=request.description
+        payload = _json_loads(await http_request.body())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid JSON body"
         )
-        return result
-    except Exception as e:
+    
+    try:
+        metadata = ShareAnalysisMetadata.model_validate(payload)
+    except ValidationError as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False)
         )
+    
+    analysis_results = payload.get("analysis_results")
+    if not isinstance(analysis_results, dict):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="analysis_results must be a JSON object"
+        )
+    
+    result = await enterprise_service.share_analysis(
+        db=db,
+        user_id=current_user.id,
+        team_id=team_id,
+        workspace_id=workspace_id,
+        analysis_type=metadata.analysis_type,
+        analysis_results=analysis_results,
+        title=metadata.title,
+        description=metadata.description
+    )
+    return result
 
-@router.get("/workspaces/{workspace_id}/analyses", response_model=List[Dict[str, Any]])
+@router.get("/workspaces/{workspace_id}/analyses", response_model=List[SharedAnalysisSummaryResponse], response_model_exclude_none=True)
+@handle_service_errors
 async def get_shared_analyses(
     workspace_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get shared analyses in a workspace"""
-    try:
-        result = await enterprise_service.get_shared_analyses(
-            workspace_id=workspace_id,
-            user_id=current_user.id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.get_shared_analyses(
+        db=db,
+        workspace_id=workspace_id,
+        user_id=current_user.id
+    )
+    return result
 
 @router.get("/analyses/{analysis_id}", response_model=Dict[str, Any])
+@handle_service_errors
 async def get_shared_analysis_details(
     analysis_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get detailed shared analysis results"""
-    try:
-        result = await enterprise_service.get_shared_analysis_details(
-            analysis_id=analysis_id,
-            user_id=current_user.id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.get_shared_analysis_details(
+        db=db,
+        analysis_id=analysis_id,
+        user_id=current_user.id
+    )
+    return result
 
 # API Key Management Endpoints
 @router.post("/teams/{team_id}/api-keys", response_model=Dict[str, Any])
+@handle_service_errors
 async def create_api_key(
     team_id: int,
     request: APIKeyCreateRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Create an API key for team use"""
-    try:
-        result = await enterprise_service.create_api_key(
-            user_id=current_user.id,
-            team_id=team_id,
-            name=request.name,
-            permissions=request.permissions,
-            expires_at=request.expires_at
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.create_api_key(
+        db=db,
+        user_id=current_user.id,
+        team_id=team_id,
+        name=request.name,
+        permissions=request.permissions,
+        expires_at=request.expires_at
+    )
+    return result
 
-@router.get("/teams/{team_id}/api-keys", response_model=List[Dict[str, Any]])
+@router.get("/teams/{team_id}/api-keys", response_model=List[APIKeyResponse])
+@handle_service_errors
 async def get_team_api_keys(
     team_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get API keys for a team"""
-    try:
-        result = await enterprise_service.get_team_api_keys(
-            team_id=team_id,
-            user_id=current_user.id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.get_team_api_keys(
+        db=db,
+        team_id=team_id,
+        user_id=current_user.id
+    )
+    return result
 
 # Usage Analytics Endpoints
-@router.get("/teams/{team_id}/usage", response_model=Dict[str, Any])
+@router.get("/teams/{team_id}/usage", response_model=Dict[str, Any], deprecated=True)
+@handle_service_errors
 async def get_team_usage_analytics(
     team_id: int,
     days: int = 30,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get usage analytics for a team"""
-    try:
-        result = await enterprise_service.get_team_usage_analytics(
-            team_id=team_id,
-            user_id=current_user.id,
-            days=days
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    result = await enterprise_service.get_team_usage_analytics(
+        db=db,
+        team_id=team_id,
+        user_id=current_user.id,
+        days=days
+    )
+    return result
 
-@router.get("/teams/{team_id}/activity", response_model=List[Dict[str, Any]])
+@router.get("/teams/{team_id}/activity", response_model=TeamActivityPageResponse, deprecated=True)
+@handle_service_errors
 async def get_team_activity(
     team_id: int,
     days: int = 7,
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
-    """Get recent team activity"""
-    try:
-        result = await enterprise_service.get_team_activity(
-            team_id=team_id,
-            user_id=current_user.id,
-            days=days
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
+    """Get recent team activity (pass next_cursor back as cursor for the next page)"""
+    result = await enterprise_service.get_team_activity(
+        db=db,
+        team_id=team_id,
+        user_id=current_user.id,
+        days=days,
+        cursor=cursor,
+        limit=limit
+    )
+    return result
+
+@router.get("/teams/{team_id}/dashboard", response_model=TeamDashboardResponse)
+@handle_service_errors
+async def get_team_dashboard(
+    team_id: int,
+    usage_days: int = 30,
+    activity_days: int = 7,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get team members, workspaces, usage analytics and activity in one request"""
+    result = await enterprise_service.get_team_dashboard(
+        db=db,
+        team_id=team_id,
+        user_id=current_user.id,
+        usage_days=usage_days,
+        activity_days=activity_days
+    )
+    return result
 
 # Collaborative Workflow Endpoints
 @router.post("/teams/{team_id}/workspaces/{workspace_id}/workflows/execute", response_model=Dict[str, Any])
+@handle_service_errors
 async def execute_collaborative_workflow(
     team_id: int,
     workspace_id: int,
     request: WorkflowExecuteRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Execute a workflow collaboratively and share results"""
-    try:
-        result = await enterprise_service.execute_collaborative_workflow(
-            workflow_id=request.workflow_id,
-            team_id=team_id,
-            user_id=current_user.id,
-            inputs=request.inputs,
-            workspace_id=workspace_id
-        )
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
-        )
\ No newline at end of file
+    result = await enterprise_service.execute_collaborative_workflow(
+        db=db,
+        workflow_id=request.workflow_id,
+        team_id=team_id,
+        user_id=current_user.id,
+        inputs=request.inputs,
+        workspace_id=workspace_id
+    )
+    return result
\ No newline at end of file
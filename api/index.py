@@ -4,74 +4,198 @@ Minimal FastAPI application for Vercel deployment without heavy dependencies
 """
 import os
 import sys
+import logging
 import json
 import time
-from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
-from io import StringIO
+import asyncio
+import base64
+import hashlib
+import hmac
+import secrets
+import itertools
+from collections import OrderedDict
+from functools import lru_cache
 
-# Add project root to path
-current_dir = os.path.dirname(__file__)
-project_root = os.path.dirname(current_dir)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+# Add project root to path, unless this module was imported as api.* (then it already is)
+if __package__ != "api":
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
 
-# Safe FastAPI import with comprehensive error handling
+# Diagnostics go through logging with lazy %-args, so nothing is formatted or written
+# below LOG_LEVEL (default WARNING); this module is the Vercel entrypoint, so it owns
+# the root configuration (basicConfig is a no-op if logging is already configured);
+# an unknown LOG_LEVEL falls back to WARNING instead of failing the import
+_LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+_LOG_LEVEL_VALID = isinstance(logging.getLevelName(_LOG_LEVEL), int)
+logging.basicConfig(level=_LOG_LEVEL if _LOG_LEVEL_VALID else logging.WARNING)
+logger = logging.getLogger(__name__)
+if not _LOG_LEVEL_VALID:
+    logger.warning("Unknown LOG_LEVEL %r, using WARNING", _LOG_LEVEL)
+
+# Process-wide constants, read once instead of on every request
+_ENVIRONMENT = os.getenv("ENVIRONMENT", "production")
+
+# Optional faster event loop; set as the policy before the server creates its loop
+# (uvicorn's loop="auto" picks it up as well)
 try:
-    from fastapi import FastAPI, HTTPException, Request
-    from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
-    from pydantic import BaseModel
-    FASTAPI_AVAILABLE = True
-    print("✅ FastAPI imported successfully")
-except ImportError as e:
-    FASTAPI_AVAILABLE = False
-    print(f"❌ FastAPI import failed: {e}")
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+# Shared compact JSON encoder (orjson when installed); the project root is on sys.path
+from utils.serialization import ORJSON_AVAILABLE, dumps as _dumps
+
+# Root/health payloads are static (server time goes in the X-Server-Time header); clients may cache this long
+STATIC_CACHE_SECONDS = 30
+
+def _root_payload():
+    return {
+        "message": "Welcome to BioIntel.AI",
+        "description": "Free AI-powered bioinformatics platform",
+        "version": "1.0.0",
+        "status": "running",
+        "environment": _ENVIRONMENT,
+        "endpoints": {
+            "health": "/health",
+            "docs": "/docs",
+            "redoc": "/redoc"
+        }
+    }
+
+def _health_payload():
+    return {
+        "status": "healthy",
+        "version": "1.0.0"
+    }
+
+STATIC_PAYLOADS = {
+    "root": _root_payload,
+    "health": _health_payload
+}
 
-# Create minimal FastAPI app
-if FASTAPI_AVAILABLE:
+@lru_cache(maxsize=4)
+def get_static_payload(name: str) -> tuple:
+    """Return (etag, body) for a static payload, serialized once per process"""
+    body = _dumps(STATIC_PAYLOADS[name]())
+    return f'"{hashlib.sha1(body).hexdigest()}"', body
+
+# 500 bodies are {"message": ..., "error": <str>}; the prefix is encoded once
+_ERROR_500_PREFIX = b'{"message":"Internal server error","error":'
+
+# Scanners probe random paths constantly; unknown-route 404s reuse one encoded body
+_NOT_FOUND_BODY = b'{"detail":"Not Found"}'
+
+def _parse_cors_origins(raw: str) -> list:
+    """Accept CORS_ORIGINS as a JSON list (as in vercel.json) or a comma-separated string"""
+    raw = raw.strip()
+    if raw.startswith("["):
+        return json.loads(raw)
+    return [origin.strip() for origin in raw.split(",") if origin.strip()]
+
+CORS_ORIGINS = _parse_cors_origins(os.getenv("CORS_ORIGINS", "*"))
+
+# Server time travels as a header so response bodies stay byte-identical (and ETag-able).
+# The clock is read once per request; handlers reuse it as request.state.t. This is plain
+# ASGI wrapping send, not @app.middleware("http"), so it adds no task or memory stream
+class ServerTimeMiddleware:
+    """Add an X-Server-Time header to every HTTP response"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        now = time.time()
+        scope.setdefault("state", {})["t"] = now
+        server_time = (b"x-server-time", f"{now:.3f}".encode())
+        
+        async def send_with_server_time(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), server_time]
+            await send(message)
+        
+        await self.app(scope, receive, send_with_server_time)
+
+def _build_app():
+    """Import FastAPI and build the app; returns None if FastAPI is unavailable"""
+    # Safe FastAPI import with comprehensive error handling
+    try:
+        from fastapi import FastAPI, HTTPException, Request
+        from fastapi.middleware.cors import CORSMiddleware
+        from fastapi.responses import JSONResponse, Response
+        from pydantic import BaseModel
+        if ORJSON_AVAILABLE:
+            from fastapi.responses import ORJSONResponse as DefaultResponse
+        else:
+            DefaultResponse = JSONResponse
+        logger.debug("FastAPI imported")
+    except ImportError as e:
+        logger.warning("FastAPI import failed, app not created: %s", e)
+        return None
+    
+    # Create minimal FastAPI app
     app = FastAPI(
         title="BioIntel.AI",
         description="Free AI-powered bioinformatics platform",
         version="1.0.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=DefaultResponse
     )
     
-    # Add CORS
+    # Add CORS - credentials are only allowed with an explicit origin list (a wildcard with
+    # credentials is invalid per the CORS spec); browsers cache preflights for max_age seconds
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        allow_origins=CORS_ORIGINS,
+        allow_credentials="*" not in CORS_ORIGINS,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["Authorization", "Content-Type"],
+        max_age=86400,
     )
     
+    @app.exception_handler(404)
+    async def not_found_handler(request: Request, exc: HTTPException):
+        if exc.detail != "Not Found":
+            # A route's own 404 keeps its detail message
+            return JSONResponse(status_code=404, content={"detail": exc.detail}, headers=exc.headers)
+        return Response(content=_NOT_FOUND_BODY, status_code=404, media_type="application/json")
+    
+    # Safety net so routes don't each need their own catch-all try/except
+    @app.exception_handler(Exception)
+    async def global_exception_handler(request: Request, exc: Exception):
+        logger.error("Unhandled error on %s: %s", request.url.path, exc)
+        # Only the error string is encoded; the rest of the body is a fixed prefix
+        return Response(
+            content=_ERROR_500_PREFIX + _dumps(str(exc)) + b"}",
+            status_code=500,
+            media_type="application/json"
+        )
+    
+    app.add_middleware(ServerTimeMiddleware)
+    
+    def _static_response(request: Request, name: str):
+        """Serve a cached static payload, answering 304 when the client's ETag matches"""
+        etag, body = get_static_payload(name)
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={STATIC_CACHE_SECONDS}"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    
     # Root endpoint
     @app.get("/")
-    async def root():
-        return {
-            "message": "Welcome to BioIntel.AI",
-            "description": "Free AI-powered bioinformatics platform",
-            "version": "1.0.0",
-            "status": "running",
-            "timestamp": time.time(),
-            "environment": os.getenv("ENVIRONMENT", "production"),
-            "endpoints": {
-                "health": "/health",
-                "docs": "/docs",
-                "redoc": "/redoc"
-            }
-        }
+    async def root(request: Request):
+        return _static_response(request, "root")
     
     # Health check
     @app.get("/health")
-    async def health():
-        return {
-            "status": "healthy",
-            "timestamp": time.time(),
-            "version": "1.0.0"
-        }
+    async def health(request: Request):
+        return _static_response(request, "health")
     
     # Authentication endpoints with database integration
     class UserRegister(BaseModel):
@@ -83,58 +207,98 @@ if FASTAPI_AVAILABLE:
         email: str
         password: str
     
-    # Safe imports for authentication - Force fallback for Vercel compatibility
+    # Database-backed auth (services, SQLAlchemy, redis, passlib, jose) is imported on the
+    # first auth request rather than at cold start, so probes only pay for FastAPI itself.
+    _auth_state = {}
+    
+    def _get_auth_service():
+        """Return the AuthService, or None when running on the in-memory fallback"""
+        if "service" not in _auth_state:
+            try:
+                # Force fallback mode for Vercel deployment
+                if os.getenv("ENVIRONMENT") == "production":
+                    raise ImportError("Using fallback mode for Vercel deployment")
+                
+                from services.auth_service import AuthService
+                _auth_state["service"] = AuthService()
+                logger.debug("Authentication services imported")
+            except ImportError as e:
+                _auth_state["service"] = None
+                logger.warning("Using fallback authentication system: %s", e)
+        return _auth_state["service"]
+    
+    # Create minimal in-memory user storage for fallback, bounded by evicting the least
+    # recently used users first
+    MAX_FALLBACK_USERS = 50_000
+    USERS_DB = OrderedDict()
+    _user_ids = itertools.count(1)
+    
+    # Fallback tokens are stateless: base64url(JSON claims) + "." + base64url(HMAC-SHA256),
+    # so verifying one is a hash and no session state is kept. The key comes only from
+    # SESSION_SECRET - never SECRET_KEY, which vercel.json commits as a public placeholder.
+    # Without it a per-process random key is used, so tokens, like the old in-memory
+    # sessions, do not survive a cold start but cannot be forged
+    SESSION_TTL_SECONDS = 1800
+    _session_secret = os.getenv("SESSION_SECRET")
+    if not _session_secret:
+        if _ENVIRONMENT == "production":
+            logger.warning("SESSION_SECRET is not set; fallback tokens use a per-process key")
+        _session_secret = secrets.token_hex(32)
+    _SESSION_SECRET = _session_secret.encode()
+    
+    # Fallback passwords are hashed with Argon2id (RFC 9106 / OWASP parameters), or with
+    # stdlib scrypt when argon2-cffi is missing; both are memory-hard, unlike a bare SHA-256
     try:
-        # Force fallback mode for Vercel deployment
-        if os.getenv("ENVIRONMENT") == "production":
-            raise ImportError("Using fallback mode for Vercel deployment")
-            
-        from services.auth_service import AuthService
-        from models.database import get_db
-        from utils.security import security_utils
-        from fastapi import Depends, HTTPException, status
-        from fastapi.security import HTTPBearer
-        AUTH_AVAILABLE = True
-        auth_service = AuthService()
-        security = HTTPBearer()
-        print("✅ Authentication services imported successfully")
-    except ImportError as e:
-        AUTH_AVAILABLE = False
-        print(f"⚠️ Using fallback authentication system: {e}")
-        
-        # Create minimal in-memory user storage for fallback
-        USERS_DB = {}
-        SESSIONS_DB = {}
-        
-        def simple_hash_password(password: str) -> str:
-            import hashlib
-            return hashlib.sha256(password.encode()).hexdigest()
-        
-        def verify_simple_password(password: str, hashed: str) -> bool:
-            import hashlib
-            return hashlib.sha256(password.encode()).hexdigest() == hashed
-        
-        def create_simple_token(user_data: dict) -> str:
-            import secrets
-            import time
-            token = secrets.token_urlsafe(32)
-            SESSIONS_DB[token] = {**user_data, "expires": time.time() + 1800}  # 30 min
-            return token
-        
-        def verify_simple_token(token: str) -> dict:
-            import time
-            if token in SESSIONS_DB:
-                session = SESSIONS_DB[token]
-                if session["expires"] > time.time():
-                    return session
-                else:
-                    del SESSIONS_DB[token]
+        from argon2 import PasswordHasher
+        from argon2.exceptions import InvalidHashError, VerificationError
+        _password_hasher = PasswordHasher(
+            time_cost=3, memory_cost=65536, parallelism=2, hash_len=32, salt_len=16
+        )
+    except ImportError:
+        _password_hasher = None
+    
+    def simple_hash_password(password: str) -> str:
+        if _password_hasher is not None:
+            return _password_hasher.hash(password)
+        salt = os.urandom(16)
+        digest = hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1)
+        return f"scrypt${salt.hex()}${digest.hex()}"
+    
+    def verify_simple_password(password: str, hashed: str) -> bool:
+        if hashed.startswith("$argon2"):
+            if _password_hasher is None:
+                return False
+            try:
+                return _password_hasher.verify(hashed, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        _, salt, digest = hashed.split("$")
+        candidate = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=2**14, r=8, p=1)
+        # Constant-time compare so response timing doesn't leak how much of the hash matched
+        return hmac.compare_digest(candidate.hex(), digest)
+    
+    def create_simple_token(user_data: dict, now: float) -> str:
+        claims = base64.urlsafe_b64encode(_dumps({**user_data, "expires": now + SESSION_TTL_SECONDS}))
+        signature = hmac.new(_SESSION_SECRET, claims, hashlib.sha256).digest()
+        return (claims + b"." + base64.urlsafe_b64encode(signature)).decode()
+    
+    def verify_simple_token(token: str, now: float) -> dict:
+        try:
+            claims, signature = token.encode().split(b".")
+            expected = hmac.new(_SESSION_SECRET, claims, hashlib.sha256).digest()
+            if not hmac.compare_digest(base64.urlsafe_b64decode(signature), expected):
+                return None
+            session = json.loads(base64.urlsafe_b64decode(claims))
+        except ValueError:
+            # Malformed token: wrong shape, bad base64 or non-UTF-8 input
             return None
+        return session if session["expires"] > now else None
     
     @app.post("/api/auth/register")
-    async def register(user: UserRegister):
+    async def register(user: UserRegister, request: Request):
         """User registration with database or in-memory fallback"""
-        if AUTH_AVAILABLE:
+        auth_service = _get_auth_service()
+        if auth_service is not None:
             try:
                 result = await auth_service.register_user({
                     "email": user.email,
@@ -145,7 +309,7 @@ if FASTAPI_AVAILABLE:
             except HTTPException as e:
                 raise e
             except Exception as e:
-                print(f"Registration error: {e}")
+                logger.error("Registration error: %s", e)
                 return {
                     "error": "Registration failed", 
                     "message": "Please try again later",
@@ -160,20 +324,26 @@ if FASTAPI_AVAILABLE:
             if len(user.password) < 8:
                 raise HTTPException(status_code=400, detail="Password must be at least 8 characters")
             
+            # Hashing is deliberately slow; keep it off the event loop
+            hashed_password = await asyncio.to_thread(simple_hash_password, user.password)
+            if user.email in USERS_DB:
+                # Registered concurrently while this request was hashing
+                raise HTTPException(status_code=400, detail="User already exists")
+            
             # Store user
-            import time
-            user_id = len(USERS_DB) + 1
-            hashed_password = simple_hash_password(user.password)
+            user_id = next(_user_ids)
+            if len(USERS_DB) >= MAX_FALLBACK_USERS:
+                USERS_DB.popitem(last=False)
             USERS_DB[user.email] = {
                 "id": user_id,
                 "email": user.email,
                 "full_name": user.full_name,
                 "hashed_password": hashed_password,
-                "created_at": time.time()
+                "created_at": request.state.t
             }
             
             # Create token
-            token = create_simple_token({"user_id": user_id, "email": user.email})
+            token = create_simple_token({"user_id": user_id, "email": user.email}, request.state.t)
             
             return {
                 "message": "User registered successfully (in-memory)",
@@ -188,16 +358,17 @@ if FASTAPI_AVAILABLE:
             }
     
     @app.post("/api/auth/login") 
-    async def login(user: UserLogin):
+    async def login(user: UserLogin, request: Request):
         """User login with database or in-memory fallback"""
-        if AUTH_AVAILABLE:
+        auth_service = _get_auth_service()
+        if auth_service is not None:
             try:
                 result = await auth_service.authenticate_user(user.email, user.password)
                 return result
             except HTTPException as e:
                 raise e
             except Exception as e:
-                print(f"Login error: {e}")
+                logger.error("Login error: %s", e)
                 return {
                     "error": "Login failed",
                     "message": "Please check your credentials and try again",
@@ -209,11 +380,12 @@ if FASTAPI_AVAILABLE:
                 raise HTTPException(status_code=401, detail="Invalid credentials")
             
             stored_user = USERS_DB[user.email]
-            if not verify_simple_password(user.password, stored_user["hashed_password"]):
+            USERS_DB.move_to_end(user.email)
+            if not await asyncio.to_thread(verify_simple_password, user.password, stored_user["hashed_password"]):
                 raise HTTPException(status_code=401, detail="Invalid credentials")
             
             # Create token
-            token = create_simple_token({"user_id": stored_user["id"], "email": user.email})
+            token = create_simple_token({"user_id": stored_user["id"], "email": user.email}, request.state.t)
             
             return {
                 "message": "Login successful (in-memory)",
@@ -227,40 +399,28 @@ if FASTAPI_AVAILABLE:
                 "note": "Using lightweight in-memory storage for demo"
             }
     
-    if AUTH_AVAILABLE:
-        async def get_current_user_safe(token: str = Depends(security)):
-            """Get current user with safe error handling"""
-            try:
-                user = await auth_service.get_current_user(token.credentials)
-                return user
-            except HTTPException as e:
-                raise e
-            except Exception as e:
-                print(f"Token validation error: {e}")
-                raise HTTPException(status_code=401, detail="Invalid authentication")
-    else:
-        async def get_current_user_safe(authorization: str = None):
-            """Fallback user authentication"""
-            from fastapi import Header
-            if not authorization:
-                raise HTTPException(status_code=401, detail="Authorization header required")
+    async def get_current_user_safe(authorization: str = None, now: float = None):
+        """Fallback user authentication"""
+        if not authorization:
+            raise HTTPException(status_code=401, detail="Authorization header required")
+        
+        if not authorization.startswith("Bearer "):
+            raise HTTPException(status_code=401, detail="Invalid authorization format")
             
-            if not authorization.startswith("Bearer "):
-                raise HTTPException(status_code=401, detail="Invalid authorization format")
-                
-            token = authorization.split(" ", 1)[1]
-            session = verify_simple_token(token)
-            if not session:
-                raise HTTPException(status_code=401, detail="Invalid or expired token")
-                
-            return session
+        token = authorization.split(" ", 1)[1]
+        session = verify_simple_token(token, time.time() if now is None else now)
+        if not session:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+            
+        return session
     
     @app.get("/api/auth/me") 
     async def get_me(request: Request):
         """Get current user information"""
         authorization = request.headers.get("authorization")
         
-        if AUTH_AVAILABLE:
+        auth_service = _get_auth_service()
+        if auth_service is not None:
             try:
                 # Extract token from authorization header manually
                 if not authorization or not authorization.startswith("Bearer "):
@@ -276,7 +436,7 @@ if FASTAPI_AVAILABLE:
             except HTTPException as e:
                 raise e
             except Exception as e:
-                print(f"User info error: {e}")
+                logger.error("User info error: %s", e)
                 return {
                     "error": "Failed to retrieve user information",
                     "message": "Please try again later"
@@ -284,7 +444,7 @@ if FASTAPI_AVAILABLE:
         else:
             # Fallback system
             try:
-                current_user = await get_current_user_safe(authorization)
+                current_user = await get_current_user_safe(authorization, request.state.t)
                 return {
                     "user": {
                         "id": current_user["user_id"],
@@ -298,7 +458,8 @@ if FASTAPI_AVAILABLE:
     @app.post("/api/auth/refresh")
     async def refresh_token(refresh_token: str):
         """Refresh access token"""
-        if not AUTH_AVAILABLE:
+        auth_service = _get_auth_service()
+        if auth_service is None:
             return {
                 "message": "Token refresh service temporarily unavailable",
                 "status": "service_initializing"
@@ -310,261 +471,25 @@ if FASTAPI_AVAILABLE:
         except HTTPException as e:
             raise e
         except Exception as e:
-            print(f"Token refresh error: {e}")
+            logger.error("Token refresh error: %s", e)
             return {
                 "error": "Token refresh failed",
                 "message": "Please log in again"
             }
     
-    print("✅ FastAPI app created successfully")
-    
-else:
-    app = None
-    print("❌ FastAPI app creation failed")
+    logger.debug("FastAPI app created")
+    return app
 
-# Vercel handler class
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self._handle_request()
-    
-    def do_POST(self):
-        self._handle_request()
-    
-    def do_PUT(self):
-        self._handle_request()
-    
-    def do_DELETE(self):
-        self._handle_request()
-    
-    def do_PATCH(self):
-        self._handle_request()
-    
-    def do_OPTIONS(self):
-        self._send_cors_headers()
-        self.end_headers()
-    
-    def _handle_request(self):
-        """Handle all HTTP requests by delegating to FastAPI"""
-        try:
-            if not FASTAPI_AVAILABLE or not app:
-                self._send_error_response(500, "FastAPI not available")
-                return
-            
-            # Create ASGI scope for FastAPI
-            from io import BytesIO
-            import asyncio
-            
-            # Read request body for POST requests
-            content_length = int(self.headers.get('content-length', 0))
-            request_body = b''
-            if content_length > 0:
-                request_body = self.rfile.read(content_length)
-            
-            # Parse URL
-            parsed_url = urlparse(self.path)
-            path = parsed_url.path
-            query_string = parsed_url.query.encode() if parsed_url.query else b''
-            
-            # Create ASGI scope
-            scope = {
-                "type": "http",
-                "method": self.command,
-                "path": path,
-                "query_string": query_string,
-                "headers": [
-                    (name.lower().encode(), value.encode()) 
-                    for name, value in self.headers.items()
-                ],
-                "server": ("localhost", 8000),
-                "client": (self.client_address[0], self.client_address[1])
-            }
-            
-            # Async receive callable
-            async def receive():
-                return {
-                    "type": "http.request",
-                    "body": request_body,
-                    "more_body": False
-                }
-            
-            # Response data
-            response_data = {
-                "status": 200,
-                "headers": [],
-                "body": b""
-            }
-            
-            # Async send callable  
-            async def send(message):
-                if message["type"] == "http.response.start":
-                    response_data["status"] = message["status"]
-                    response_data["headers"] = message.get("headers", [])
-                elif message["type"] == "http.response.body":
-                    response_data["body"] += message.get("body", b"")
-            
-            # Run FastAPI app
-            async def run_app():
-                await app(scope, receive, send)
-            
-            # Execute async
-            try:
-                asyncio.run(run_app())
-                
-                # Send response
-                self.send_response(response_data["status"])
-                self._send_cors_headers()
-                
-                # Send headers
-                for header_name, header_value in response_data["headers"]:
-                    self.send_header(header_name.decode(), header_value.decode())
-                
-                self.end_headers()
-                
-                # Send body
-                if response_data["body"]:
-                    self.wfile.write(response_data["body"])
-                    
-            except Exception as fastapi_error:
-                print(f"FastAPI execution error: {fastapi_error}")
-                # Fallback to simple routing for critical endpoints
-                self._handle_fallback_routing()
-                
-        except Exception as e:
-            print(f"Request handling error: {e}")
-            self._send_error_response(500, f"Internal server error: {str(e)}")
-    
-    def _handle_fallback_routing(self):
-        """Fallback routing when FastAPI delegation fails"""
-        parsed_url = urlparse(self.path)
-        path = parsed_url.path
-        
-        if path == "/" or path == "":
-            response_data = {
-                "message": "Welcome to BioIntel.AI",
-                "description": "Free AI-powered bioinformatics platform", 
-                "version": "1.0.0",
-                "status": "running",
-                "timestamp": time.time(),
-                "endpoints": {
-                    "health": "/health",
-                    "docs": "/docs",
-                    "auth_register": "/api/auth/register (POST)",
-                    "auth_login": "/api/auth/login (POST)"
-                }
-            }
-            self._send_json_response(200, response_data)
-            
-        elif path == "/health":
-            response_data = {
-                "status": "healthy",
-                "timestamp": time.time(),
-                "version": "1.0.0",
-                "environment": os.getenv("ENVIRONMENT", "production")
-            }
-            self._send_json_response(200, response_data)
-            
-        elif path in ["/api/auth/register", "/api/auth/registration"] and self.command == "POST":
-            # Handle both register and registration paths
-            response_data = {
-                "message": "Registration endpoint ready",
-                "note": "Use POST /api/auth/register with JSON body: {\"email\": \"user@example.com\", \"password\": \"pass123\", \"full_name\": \"Name\"}",
-                "status": "service_initializing",
-                "timestamp": time.time()
-            }
-            self._send_json_response(200, response_data)
-            
-        elif path == "/api/auth/login" and self.command == "POST":
-            response_data = {
-                "message": "Login endpoint ready",
-                "note": "Use POST /api/auth/login with JSON body: {\"email\": \"user@example.com\", \"password\": \"pass123\"}",
-                "status": "service_initializing", 
-                "timestamp": time.time()
-            }
-            self._send_json_response(200, response_data)
-            
-        elif path in ["/api/auth/register", "/api/auth/registration", "/api/auth/login"] and self.command == "GET":
-            # Helpful error for wrong HTTP method
-            response_data = {
-                "error": "Method Not Allowed",
-                "message": f"Endpoint {path} requires POST request, not GET",
-                "correct_usage": f"POST {path}",
-                "content_type": "application/json",
-                "example_body": {
-                    "email": "user@example.com",
-                    "password": "your_password",
-                    "full_name": "Your Name" if "register" in path else None
-                },
-                "timestamp": time.time()
-            }
-            # Remove None values
-            response_data["example_body"] = {k: v for k, v in response_data["example_body"].items() if v is not None}
-            self._send_json_response(405, response_data)
-            
-        else:
-            # 404 for unknown paths
-            response_data = {
-                "error": "Not Found",
-                "path": path,
-                "method": self.command,
-                "available_endpoints": [
-                    "/",
-                    "/health", 
-                    "/docs",
-                    "POST /api/auth/register",
-                    "POST /api/auth/login"
-                ],
-                "note": "Authentication endpoints require POST requests",
-                "timestamp": time.time()
-            }
-            self._send_json_response(404, response_data)
-    
-    def _send_json_response(self, status_code, data):
-        """Send JSON response"""
-        try:
-            response_json = json.dumps(data, indent=2)
-            self.send_response(status_code)
-            self._send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(response_json)))
-            self.end_headers()
-            self.wfile.write(response_json.encode('utf-8'))
-        except Exception as e:
-            print(f"JSON response error: {e}")
-            self._send_error_response(500, "Response generation failed")
-    
-    def _send_error_response(self, status_code, message):
-        """Send error response"""
-        try:
-            error_data = {
-                "error": message,
-                "status_code": status_code,
-                "timestamp": time.time()
-            }
-            response_json = json.dumps(error_data)
-            self.send_response(status_code)
-            self._send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(response_json.encode('utf-8'))
-        except Exception as e:
-            print(f"Error response failed: {e}")
-    
-    def _send_cors_headers(self):
-        """Send CORS headers"""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.send_header('Access-Control-Max-Age', '86400')
-    
-    def log_message(self, format, *args):
-        """Override to prevent log spam"""
-        pass
+# Vercel's Python runtime looks up the module-level ASGI `app` directly, so it must be a
+# real attribute (not resolved lazily)
+app = _build_app()
+FASTAPI_AVAILABLE = app is not None
 
 # For local testing
 if __name__ == "__main__":
     print("🚀 Starting BioIntel.AI Safe Handler")
     print(f"FastAPI Available: {FASTAPI_AVAILABLE}")
-    if FASTAPI_AVAILABLE and app:
+    if FASTAPI_AVAILABLE:
         import uvicorn
         uvicorn.run(app, host="0.0.0.0", port=8000)
     else:
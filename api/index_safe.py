@@ -1,32 +1,44 @@
 """
-BioIntel.AI - Ultra-Safe Vercel Handler
+BioIntel.AI - Ultra-Safe Vercel App
 Minimal FastAPI application for Vercel deployment without heavy dependencies
 """
 import os
 import sys
-import json
+import logging
 import time
-from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
-from io import StringIO
+from functools import lru_cache
 
-# Add project root to path
-current_dir = os.path.dirname(__file__)
-project_root = os.path.dirname(current_dir)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+# Add project root to path, unless this module was imported as api.* (then it already is)
+if __package__ != "api":
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+
+# Startup messages go through logging: debug lines cost nothing unless enabled, and
+# warnings still reach stderr through logging's last-resort handler
+logger = logging.getLogger(__name__)
+
+# Process-wide constants, read once instead of on every request
+_ENVIRONMENT = os.getenv("ENVIRONMENT", "production")
+
+# Shared JSON codec (orjson when installed); the project root is on sys.path
+from utils.serialization import ORJSON_AVAILABLE, dumps as _dumps, loads as _loads
 
 # Safe FastAPI import with comprehensive error handling
 try:
     from fastapi import FastAPI, HTTPException, Request
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import JSONResponse, Response
+    if ORJSON_AVAILABLE:
+        from fastapi.responses import ORJSONResponse as DefaultResponse
+    else:
+        DefaultResponse = JSONResponse
     from pydantic import BaseModel
     FASTAPI_AVAILABLE = True
-    print("✅ FastAPI imported successfully")
+    logger.debug("FastAPI imported")
 except ImportError as e:
     FASTAPI_AVAILABLE = False
-    print(f"❌ FastAPI import failed: {e}")
+    logger.warning("FastAPI import failed: %s", e)
 
 # Create minimal FastAPI app
 if FASTAPI_AVAILABLE:
@@ -35,43 +47,57 @@ if FASTAPI_AVAILABLE:
         description="Free AI-powered bioinformatics platform",
         version="1.0.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=DefaultResponse
     )
     
     # Add CORS
+    # Fixed header values let Starlette reuse one precomputed CORS header set (no
+    # per-request Origin echo), as the old handler's hardcoded headers did;
+    # browsers cache preflights for max_age seconds
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        allow_headers=["Authorization", "Content-Type"],
+        max_age=86400,
     )
     
     # Root endpoint
-    @app.get("/")
-    async def root():
-        return {
+    # Bodies are serialized once; root only splices in the request timestamp
+    @lru_cache(maxsize=1)
+    def _root_template():
+        return tuple(_dumps({
             "message": "Welcome to BioIntel.AI",
             "description": "Free AI-powered bioinformatics platform",
             "version": "1.0.0",
             "status": "running",
-            "timestamp": time.time(),
-            "environment": os.getenv("ENVIRONMENT", "production"),
+            "timestamp": "__TS__",
+            "environment": _ENVIRONMENT,
             "endpoints": {
                 "health": "/health",
                 "docs": "/docs",
                 "redoc": "/redoc"
             }
-        }
+        }).split(b'"__TS__"'))
+    
+    @app.get("/")
+    async def root():
+        head, tail = _root_template()
+        return Response(content=head + repr(time.time()).encode() + tail, media_type="application/json")
     
     # Health check
-    @app.get("/health")
-    async def health():
-        return {
+    # Probed constantly, so it is fully static (no timestamp)
+    @lru_cache(maxsize=1)
+    def _health_body():
+        return _dumps({
             "status": "healthy",
-            "timestamp": time.time(),
             "version": "1.0.0"
-        }
+        })
+    
+    @app.get("/health")
+    async def health():
+        return Response(content=_health_body(), media_type="application/json")
     
     # Safe authentication endpoints (without heavy imports)
     class UserRegister(BaseModel):
@@ -83,21 +109,40 @@ if FASTAPI_AVAILABLE:
         email: str
         password: str
     
-    @app.post("/api/auth/register")
-    async def register(user: UserRegister):
+    # These stubs only echo the email, so the body is parsed directly instead of being
+    # validated into a model per request; the models still document the body schema
+    def _body_schema(model):
+        return {
+            "requestBody": {
+                "required": True,
+                "content": {"application/json": {"schema": model.model_json_schema()}}
+            }
+        }
+    
+    async def _request_email(request: Request) -> str:
+        try:
+            email = _loads(await request.body())["email"]
+        except (ValueError, TypeError, KeyError):
+            email = None
+        if not isinstance(email, str):
+            raise HTTPException(status_code=422, detail="email is required")
+        return email
+    
+    @app.post("/api/auth/register", openapi_extra=_body_schema(UserRegister))
+    async def register(request: Request):
         """Safe registration endpoint"""
         return {
             "message": "Registration endpoint available",
-            "email": user.email,
+            "email": await _request_email(request),
             "status": "authentication_service_initializing"
         }
     
-    @app.post("/api/auth/login") 
-    async def login(user: UserLogin):
+    @app.post("/api/auth/login", openapi_extra=_body_schema(UserLogin))
+    async def login(request: Request):
         """Safe login endpoint"""
         return {
             "message": "Login endpoint available",
-            "email": user.email,
+            "email": await _request_email(request),
             "status": "authentication_service_initializing"
         }
     
@@ -109,152 +154,17 @@ if FASTAPI_AVAILABLE:
             "status": "authentication_service_initializing"
         }
     
-    print("✅ FastAPI app created successfully")
+    logger.debug("FastAPI app created")
     
 else:
     app = None
-    print("❌ FastAPI app creation failed")
+    logger.warning("FastAPI app creation failed")
 
-# Vercel handler class
-class handler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        self._handle_request()
-    
-    def do_POST(self):
-        self._handle_request()
-    
-    def do_PUT(self):
-        self._handle_request()
-    
-    def do_DELETE(self):
-        self._handle_request()
-    
-    def do_PATCH(self):
-        self._handle_request()
-    
-    def do_OPTIONS(self):
-        self._send_cors_headers()
-        self.end_headers()
-    
-    def _handle_request(self):
-        """Handle all HTTP requests safely"""
-        try:
-            if not FASTAPI_AVAILABLE or not app:
-                self._send_error_response(500, "FastAPI not available")
-                return
-            
-            # Parse request
-            parsed_url = urlparse(self.path)
-            path = parsed_url.path
-            
-            # Basic routing
-            if path == "/" or path == "":
-                response_data = {
-                    "message": "Welcome to BioIntel.AI",
-                    "description": "Free AI-powered bioinformatics platform", 
-                    "version": "1.0.0",
-                    "status": "running",
-                    "timestamp": time.time(),
-                    "endpoints": {
-                        "health": "/health",
-                        "docs": "/docs",
-                        "auth_register": "/api/auth/register",
-                        "auth_login": "/api/auth/login"
-                    }
-                }
-                self._send_json_response(200, response_data)
-                
-            elif path == "/health":
-                response_data = {
-                    "status": "healthy",
-                    "timestamp": time.time(),
-                    "version": "1.0.0",
-                    "environment": os.getenv("ENVIRONMENT", "production")
-                }
-                self._send_json_response(200, response_data)
-                
-            elif path == "/api/auth/register" and self.command == "POST":
-                response_data = {
-                    "message": "Registration endpoint ready",
-                    "status": "service_initializing",
-                    "timestamp": time.time()
-                }
-                self._send_json_response(200, response_data)
-                
-            elif path == "/api/auth/login" and self.command == "POST":
-                response_data = {
-                    "message": "Login endpoint ready", 
-                    "status": "service_initializing",
-                    "timestamp": time.time()
-                }
-                self._send_json_response(200, response_data)
-                
-            else:
-                # 404 for unknown paths
-                response_data = {
-                    "error": "Not Found",
-                    "path": path,
-                    "method": self.command,
-                    "available_endpoints": [
-                        "/",
-                        "/health", 
-                        "/docs",
-                        "/api/auth/register",
-                        "/api/auth/login"
-                    ],
-                    "timestamp": time.time()
-                }
-                self._send_json_response(404, response_data)
-                
-        except Exception as e:
-            print(f"Request handling error: {e}")
-            self._send_error_response(500, f"Internal server error: {str(e)}")
-    
-    def _send_json_response(self, status_code, data):
-        """Send JSON response"""
-        try:
-            response_json = json.dumps(data, indent=2)
-            self.send_response(status_code)
-            self._send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(response_json)))
-            self.end_headers()
-            self.wfile.write(response_json.encode('utf-8'))
-        except Exception as e:
-            print(f"JSON response error: {e}")
-            self._send_error_response(500, "Response generation failed")
-    
-    def _send_error_response(self, status_code, message):
-        """Send error response"""
-        try:
-            error_data = {
-                "error": message,
-                "status_code": status_code,
-                "timestamp": time.time()
-            }
-            response_json = json.dumps(error_data)
-            self.send_response(status_code)
-            self._send_cors_headers()
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(response_json.encode('utf-8'))
-        except Exception as e:
-            print(f"Error response failed: {e}")
-    
-    def _send_cors_headers(self):
-        """Send CORS headers"""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.send_header('Access-Control-Max-Age', '86400')
-    
-    def log_message(self, format, *args):
-        """Override to prevent log spam"""
-        pass
+# Vercel's Python runtime serves the module-level ASGI `app` directly
 
 # For local testing
 if __name__ == "__main__":
-    print("🚀 Starting BioIntel.AI Safe Handler")
+    print("🚀 Starting BioIntel.AI Safe App")
     print(f"FastAPI Available: {FASTAPI_AVAILABLE}")
     if FASTAPI_AVAILABLE and app:
         import uvicorn
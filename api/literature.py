@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, ConfigDict
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import json
@@ -8,7 +8,12 @@ import json
 from services.literature_service import literature_service
 from api.auth import get_current_user
 from models.user import User
+from models.database import get_db
+from models.literature import LiteratureSummary, ChatSession, ChatMessage
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session
 from utils.logging import get_logger
+from utils.health import health_response
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -24,8 +29,8 @@ class AbstractRequest(BaseModel):
     pmid: Optional[str] = None
     source_url: Optional[HttpUrl] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "abstract": "Background: Cancer is a leading cause of death worldwide. This study investigates novel biomarkers for early detection. Methods: We analyzed RNA-seq data from 500 patients. Results: We identified 15 genes significantly associated with cancer progression. Conclusion: These biomarkers show promise for clinical application.",
                 "title": "Novel Biomarkers for Cancer Detection",
@@ -36,18 +41,20 @@ class AbstractRequest(BaseModel):
                 "pmid": "38123456"
             }
         }
+    )
 
 class ChatRequest(BaseModel):
     question: str = Field(..., min_length=5, max_length=1000)
     session_id: Optional[int] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "question": "What biomarkers were identified in this study?",
                 "session_id": 1
             }
         }
+    )
 
 class LiteratureSummaryResponse(BaseModel):
     id: int
@@ -211,14 +218,11 @@ async def list_literature_summaries(
 @router.get("/summaries/{summary_id}")
 async def get_literature_summary(
     summary_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get literature summary details"""
     try:
-        from models.database import get_db
-        from models.literature import LiteratureSummary
-        
-        db = next(get_db())
         summary = db.query(LiteratureSummary).filter(
             LiteratureSummary.id == summary_id,
             LiteratureSummary.user_id == current_user.id
@@ -244,15 +248,11 @@ async def get_literature_summary(
 @router.delete("/summaries/{summary_id}")
 async def delete_literature_summary(
     summary_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Delete literature summary"""
     try:
-        from models.database import get_db
-        from models.literature import LiteratureSummary, ChatSession, ChatMessage
-        
-        db = next(get_db())
-        
         # Check if summary exists and belongs to user
         summary = db.query(LiteratureSummary).filter(
             LiteratureSummary.id == summary_id,
@@ -366,15 +366,11 @@ async def get_chat_messages(
 @router.delete("/chat/sessions/{session_id}")
 async def delete_chat_session(
     session_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Delete chat session"""
     try:
-        from models.database import get_db
-        from models.literature import ChatSession, ChatMessage
-        
-        db = next(get_db())
-        
         # Check if session exists and belongs to user
         session = db.query(ChatSession).filter(
             ChatSession.id == session_id,
@@ -413,16 +409,11 @@ async def search_literature(
     literature_type: Optional[str] = None,
     skip: int = 0,
     limit: int = 20,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Search user's literature summaries"""
     try:
-        from models.database import get_db
-        from models.literature import LiteratureSummary
-        from sqlalchemy import or_
-        
-        db = next(get_db())
-        
         # Build search query
         search_query = db.query(LiteratureSummary).filter(
             LiteratureSummary.user_id == current_user.id
@@ -466,16 +457,11 @@ async def search_literature(
 
 @router.get("/stats")
 async def get_literature_stats(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get user's literature processing statistics"""
     try:
-        from models.database import get_db
-        from models.literature import LiteratureSummary, ChatSession, ChatMessage
-        from sqlalchemy import func
-        
-        db = next(get_db())
-        
         # Get summary statistics
         total_summaries = db.query(LiteratureSummary).filter(
             LiteratureSummary.user_id == current_user.id
@@ -530,8 +516,4 @@ async def get_literature_stats(
 @router.get("/health")
 async def literature_health_check():
     """Health check for literature service"""
-    return {
-        "service": "literature",
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
-    }
\ No newline at end of file
+    return health_response("literature")
\ No newline at end of file
@@ -1,9 +1,13 @@
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from sqlalchemy import text
 import time
 import logging
 import sys
@@ -23,11 +27,12 @@ try:
     from services.public_datasets_service import PublicDatasetsService
     from services.analysis_templates_service import AnalysisTemplatesService
     from services.research_workflows_service import ResearchWorkflowsService
-    from services.enterprise_service import EnterpriseService
+    from services.enterprise_service import EnterpriseService, request_membership_cache
     from models.database import engine, Base
     from utils.security import SecurityUtils
     from utils.logging import setup_logging
     from utils.config import get_settings
+    from utils.serialization import ORJSON_AVAILABLE, dumps
 except ImportError:
     # Try importing from same directory (alternative structure)
     import sys
@@ -43,17 +48,50 @@ except ImportError:
     from services.public_datasets_service import PublicDatasetsService
     from services.analysis_templates_service import AnalysisTemplatesService
     from services.research_workflows_service import ResearchWorkflowsService
-    from services.enterprise_service import EnterpriseService
+    from services.enterprise_service import EnterpriseService, request_membership_cache
     from models.database import engine, Base
     from utils.security import SecurityUtils
     from utils.logging import setup_logging
     from utils.config import get_settings
+    from utils.serialization import ORJSON_AVAILABLE, dumps
+
+# orjson serializes responses several times faster than the stdlib encoder
+DefaultResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
 
 # Initialize settings and logging
 settings = get_settings()
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Application lifespan: one engine/pool for the process, disposed on shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database and services on startup"""
+    try:
+        # Create database tables
+        Base.metadata.create_all(bind=engine)
+        logger.info("Database tables created successfully")
+        
+        # Initialize services
+        await AuthService.initialize()
+        await BioinformaticsService.initialize()
+        await LiteratureService.initialize()
+        await FreeAIService.initialize()
+        await BioinformaticsAPIsService.initialize()
+        await PublicDatasetsService.initialize()
+        await AnalysisTemplatesService.initialize()
+        await ResearchWorkflowsService.initialize()
+        await EnterpriseService.initialize()
+        
+        logger.info("BioIntel.AI API started successfully")
+    except Exception as e:
+        logger.error(f"Startup error: {str(e)}")
+        raise
+    
+    yield
+    
+    engine.dispose()
+
 # Create FastAPI app
 app = FastAPI(
     title="BioIntel.AI - Bioinformatics Assistant",
@@ -61,7 +99,9 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=DefaultResponse,
+    lifespan=lifespan
 )
 
 # Security middleware
@@ -79,21 +119,32 @@ class SecurityMiddleware(BaseHTTPMiddleware):
 # Request logging middleware
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Log request
-        logger.info(f"Request: {request.method} {request.url.path}")
+        logger.info("Request: %s %s", request.method, request.url.path)
         
         response = await call_next(request)
         
         # Log response
-        process_time = time.time() - start_time
-        logger.info(f"Response: {response.status_code} - {process_time:.4f}s")
+        process_time = time.perf_counter() - start_time
+        logger.info("Response: %s - %.4fs", response.status_code, process_time)
         
         return response
 
+# Request-scoped authorization cache middleware
+class AuthorizationCacheMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        # Team memberships are loaded at most once per user per request
+        token = request_membership_cache.set({})
+        try:
+            return await call_next(request)
+        finally:
+            request_membership_cache.reset(token)
+
 # Add middleware
 app.add_middleware(SecurityMiddleware)
+app.add_middleware(AuthorizationCacheMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 
 # CORS middleware
@@ -103,8 +154,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,
 )
 
+# Compress larger JSON payloads (dataset lists, analysis results); adds Vary: Accept-Encoding
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Trusted hosts (for production)
 if settings.ENVIRONMENT == "production":
     app.add_middleware(
@@ -112,31 +167,6 @@ if settings.ENVIRONMENT == "production":
         allowed_hosts=["biointel.ai", "*.biointel.ai", "*.vercel.app"]
     )
 
-# Create database tables
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database and services on startup"""
-    try:
-        # Create database tables
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-        
-        # Initialize services
-        await AuthService.initialize()
-        await BioinformaticsService.initialize()
-        await LiteratureService.initialize()
-        await FreeAIService.initialize()
-        await BioinformaticsAPIsService.initialize()
-        await PublicDatasetsService.initialize()
-        await AnalysisTemplatesService.initialize()
-        await ResearchWorkflowsService.initialize()
-        await EnterpriseService.initialize()
-        
-        logger.info("BioIntel.AI API started successfully")
-    except Exception as e:
-        logger.error(f"Startup error: {str(e)}")
-        raise
-
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -146,35 +176,35 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"message": "Internal server error", "error": str(exc)}
     )
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Comprehensive health check endpoint for monitoring"""
-    health_status = {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "version": "1.0.0",
-        "environment": settings.ENVIRONMENT
-    }
+# Database probe result is reused for this many seconds; probes check liveness, not every query
+DB_HEALTH_TTL = 5
+_db_health_cache = {"expires_at": 0.0, "status": None}
+
+def _check_database() -> str:
+    """Run SELECT 1 at most once per DB_HEALTH_TTL and return the connectivity status"""
+    now = time.monotonic()
+    if now < _db_health_cache["expires_at"]:
+        return _db_health_cache["status"]
     
-    # Check database connectivity
     try:
-        from models.database import engine
-        from sqlalchemy import text
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
-        health_status["database"] = "connected"
+        db_status = "connected"
     except Exception as e:
-        health_status["database"] = f"error: {str(e)}"
-        health_status["status"] = "degraded"
+        db_status = f"error: {str(e)}"
     
-    # Check optional dependencies
+    _db_health_cache.update(expires_at=now + DB_HEALTH_TTL, status=db_status)
+    return db_status
+
+@lru_cache(maxsize=1)
+def _optional_features():
+    """Optional dependency flags; fixed at import time, so resolved once per process"""
     try:
         from services.bioinformatics_service import SKLEARN_AVAILABLE, PLOTTING_AVAILABLE
         from services.free_ai_service import TRANSFORMERS_AVAILABLE
         from services.reports_service import WEASYPRINT_AVAILABLE, DOCX_AVAILABLE
         
-        health_status["features"] = {
+        return {
             "machine_learning": SKLEARN_AVAILABLE,
             "plotting": PLOTTING_AVAILABLE,
             "ai_processing": TRANSFORMERS_AVAILABLE,
@@ -182,20 +212,41 @@ async def health_check():
             "docx_generation": DOCX_AVAILABLE
         }
     except Exception as e:
-        health_status["features"] = f"error: {str(e)}"
+        return f"error: {str(e)}"
+
+# Health check endpoint
+@app.get("/health")
+async def health_check():
+    """Comprehensive health check endpoint for monitoring"""
+    health_status = {
+        "status": "healthy",
+        "timestamp": time.time(),
+        "version": "1.0.0",
+        "environment": settings.ENVIRONMENT
+    }
+    
+    # Check database connectivity
+    health_status["database"] = _check_database()
+    if health_status["database"] != "connected":
+        health_status["status"] = "degraded"
+    
+    # Check optional dependencies
+    health_status["features"] = _optional_features()
     
     return health_status
 
-# Root endpoint
+# Root endpoint; the payload never changes, so it is encoded once
+_ROOT_BODY = dumps({
+    "message": "Welcome to BioIntel.AI - Bioinformatics Assistant",
+    "version": "1.0.0",
+    "documentation": "/docs",
+    "health": "/health"
+})
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "message": "Welcome to BioIntel.AI - Bioinformatics Assistant",
-        "version": "1.0.0",
-        "documentation": "/docs",
-        "health": "/health"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 # Import and include routers
 from api.auth import router as auth_router
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from fastapi.responses import FileResponse, StreamingResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 import json
@@ -13,9 +13,12 @@ import time
 from services.reports_service import reports_service
 from api.auth import get_current_user
 from models.user import User
-from models.literature import Report
+from models.literature import Report, LiteratureSummary
 from models.database import get_db
+from models.bioinformatics import Dataset, AnalysisJob
+from sqlalchemy.orm import Session
 from utils.logging import get_logger
+from utils.health import health_response
 from utils.security import security_utils
 
 logger = get_logger(__name__)
@@ -39,8 +42,8 @@ class ReportRequest(BaseModel):
     include_statistics: bool = True
     include_methodology: bool = True
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "report_type": "analysis",
                 "title": "Gene Expression Analysis Report",
@@ -54,6 +57,7 @@ class ReportRequest(BaseModel):
                 "include_methodology": True
             }
         }
+    )
 
 class ReportResponse(BaseModel):
     id: int
@@ -75,19 +79,20 @@ class ReportListResponse(BaseModel):
 @router.post("/generate", response_model=ReportResponse, status_code=status.HTTP_201_CREATED)
 async def generate_report(
     report_request: ReportRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Generate a new report"""
     try:
         logger.info(f"Generating report for user {current_user.id}: {report_request.title}")
         
         # Validate data access permissions
-        await _validate_data_access(report_request, current_user.id)
+        await _validate_data_access(report_request, current_user.id, db)
         
         # Generate report
         report = await reports_service.generate_report(
             user_id=current_user.id,
-            report_request=report_request.dict()
+            report_request=report_request.model_dump()
         )
         
         logger.info(f"Report generated successfully: {report['id']}")
@@ -118,12 +123,11 @@ async def list_reports(
     skip: int = 0,
     limit: int = 20,
     report_type: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """List user's reports"""
     try:
-        db = next(get_db())
-        
         # Build query
         query = db.query(Report).filter(Report.user_id == current_user.id)
         
@@ -168,12 +172,11 @@ async def list_reports(
 @router.get("/{report_id}")
 async def get_report(
     report_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get report details"""
     try:
-        db = next(get_db())
-        
         report = db.query(Report).filter(
             Report.id == report_id,
             Report.user_id == current_user.id
@@ -199,12 +202,11 @@ async def get_report(
 @router.get("/{report_id}/download")
 async def download_report(
     report_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Download report file"""
     try:
-        db = next(get_db())
-        
         report = db.query(Report).filter(
             Report.id == report_id,
             Report.user_id == current_user.id
@@ -253,12 +255,11 @@ async def download_report(
 @router.get("/{report_id}/preview")
 async def preview_report(
     report_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Preview report content"""
     try:
-        db = next(get_db())
-        
         report = db.query(Report).filter(
             Report.id == report_id,
             Report.user_id == current_user.id
@@ -325,12 +326,11 @@ async def preview_report(
 @router.delete("/{report_id}")
 async def delete_report(
     report_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Delete report"""
     try:
-        db = next(get_db())
-        
         report = db.query(Report).filter(
             Report.id == report_id,
             Report.user_id == current_user.id
@@ -369,12 +369,11 @@ async def delete_report(
 @router.get("/{report_id}/metadata")
 async def get_report_metadata(
     report_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Get report metadata and statistics"""
     try:
-        db = next(get_db())
-        
         report = db.query(Report).filter(
             Report.id == report_id,
             Report.user_id == current_user.id
@@ -428,20 +427,13 @@ async def list_report_templates():
 @router.get("/health")
 async def reports_health_check():
     """Health check for reports service"""
-    return {
-        "service": "reports",
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return health_response("reports")
 
 # Helper functions
-async def _validate_data_access(report_request: ReportRequest, user_id: int):
+async def _validate_data_access(report_request: ReportRequest, user_id: int, db: Session):
     """Validate that user has access to requested data"""
-    db = next(get_db())
-    
     # Check dataset access
     if report_request.dataset_ids:
-        from models.bioinformatics import Dataset
         for dataset_id in report_request.dataset_ids:
             dataset = db.query(Dataset).filter(
                 Dataset.id == dataset_id,
@@ -455,7 +447,6 @@ async def _validate_data_access(report_request: ReportRequest, user_id: int):
     
     # Check analysis job access
     if report_request.analysis_job_ids:
-        from models.bioinformatics import AnalysisJob
         for job_id in report_request.analysis_job_ids:
             job = db.query(AnalysisJob).filter(
                 AnalysisJob.id == job_id,
@@ -469,7 +460,6 @@ async def _validate_data_access(report_request: ReportRequest, user_id: int):
     
     # Check literature summary access
     if report_request.literature_summary_ids:
-        from models.literature import LiteratureSummary
         for summary_id in report_request.literature_summary_ids:
             summary = db.query(LiteratureSummary).filter(
                 LiteratureSummary.id == summary_id,
@@ -3,22 +3,16 @@ Workflows API endpoints for research workflows and analysis templates
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 
 from services.research_workflows_service import research_workflows_service
 from services.analysis_templates_service import analysis_templates_service
-from services.auth_service import auth_service
+from services.public_datasets_service import public_datasets_service
+from api.auth import get_current_user, get_current_user_or_service_account
 from models.user import User
 
 router = APIRouter()
-security = HTTPBearer()
-
-# Dependency to get current user
-async def get_current_user(token: str = Depends(security)):
-    """Get current user from JWT token"""
-    return await auth_service.get_current_user(token.credentials)
 
 # Request/Response Models
 class WorkflowExecuteRequest(BaseModel):
@@ -172,7 +166,7 @@ async def export_workflow_results(
 @router.get("/templates", response_model=List[Dict[str, Any]])
 async def list_templates(
     category: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_or_service_account)
 ):
     """List available analysis templates"""
     try:
@@ -187,7 +181,7 @@ async def list_templates(
 @router.get("/templates/{template_id}", response_model=Dict[str, Any])
 async def get_template(
     template_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_or_service_account)
 ):
     """Get a specific analysis template"""
     try:
@@ -248,12 +242,10 @@ async def execute_template(
 @router.get("/datasets", response_model=Dict[str, Any])
 async def list_public_datasets(
     source: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_or_service_account)
 ):
     """List available public datasets"""
     try:
-        from services.public_datasets_service import public_datasets_service
-        
         if source:
             if source.upper() == "TCGA":
                 result = await public_datasets_service.get_tcga_datasets()
@@ -283,12 +275,10 @@ async def list_public_datasets(
 @router.get("/datasets/{dataset_id}", response_model=Dict[str, Any])
 async def get_dataset_info(
     dataset_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_or_service_account)
 ):
     """Get information about a specific dataset"""
     try:
-        from services.public_datasets_service import public_datasets_service
-        
         result = await public_datasets_service.get_dataset_info(dataset_id)
         if not result:
             raise HTTPException(
@@ -312,8 +302,6 @@ async def get_sample_data(
 ):
     """Get sample data from a dataset"""
     try:
-        from services.public_datasets_service import public_datasets_service
-        
         result = await public_datasets_service.generate_sample_data(
             dataset_id=dataset_id,
             num_samples=num_samples,
@@ -352,8 +340,6 @@ async def get_dataset_statistics(
 ):
     """Get statistics for a dataset"""
     try:
-        from services.public_datasets_service import public_datasets_service
-        
         result = await public_datasets_service.get_dataset_statistics(dataset_id)
         if not result:
             raise HTTPException(
@@ -375,8 +361,6 @@ async def get_recommended_datasets(
 ):
     """Get recommended datasets for analysis type"""
     try:
-        from services.public_datasets_service import public_datasets_service
-        
         result = await public_datasets_service.get_recommended_datasets(analysis_type)
         return [dataset.__dict__ for dataset in result]
     except Exception as e:
@@ -0,0 +1,40 @@
+"""Add composite (user_id, id) index on datasets
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Tables are created by Base.metadata.create_all at startup, so fresh databases
+already have the index; this revision adds it to databases created before it
+was declared on the Dataset model.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_datasets_user_id_id"
+
+
+def _has_index(inspector) -> bool:
+    return any(index["name"] == INDEX_NAME for index in inspector.get_indexes("datasets"))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("datasets") or _has_index(inspector):
+        return
+    op.create_index(INDEX_NAME, "datasets", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("datasets") and _has_index(inspector):
+        op.drop_index(INDEX_NAME, table_name="datasets")
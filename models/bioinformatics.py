@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey, Float, LargeBinary
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey, Float, LargeBinary, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from models.database import Base
@@ -10,6 +10,10 @@ class Dataset(Base):
     """Dataset model for storing gene expression data"""
     
     __tablename__ = "datasets"
+    __table_args__ = (
+        # Covers ownership checks (WHERE id = ? AND user_id = ?) and per-user listings
+        Index("ix_datasets_user_id_id", "user_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -18,9 +18,13 @@ if settings.DATABASE_URL.startswith("sqlite"):
         echo=settings.DEBUG
     )
 else:
-    # PostgreSQL configuration for production
+    # PostgreSQL configuration for production. The engine lives at module scope so
+    # warm workers reuse pooled connections; each process holds at most
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW of them
     engine = create_engine(
         settings.DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
         pool_pre_ping=True,
         pool_recycle=3600,
         echo=settings.DEBUG
@@ -10,6 +10,7 @@ import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
+from collections import Counter
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from sklearn.cluster import KMeans
@@ -705,7 +706,6 @@ class AnalysisTemplatesService:
             all_biomarkers.extend(biomarkers.genes + biomarkers.proteins)
         
         # Count biomarker frequency
-        from collections import Counter
         biomarker_counts = Counter(all_biomarkers)
         
         results['biomarker_extraction'] = {
@@ -10,6 +10,7 @@ from utils.logging import get_logger
 from utils.config import get_settings
 import secrets
 import hashlib
+import asyncio
 
 settings = get_settings()
 logger = get_logger(__name__)
@@ -58,8 +59,8 @@ class AuthService:
                     detail=f"Password validation failed: {', '.join(password_validation['errors'])}"
                 )
             
-            # Hash password
-            hashed_password = security_utils.hash_password(user_data["password"])
+            # Hash password (bcrypt is CPU-bound; keep it off the event loop)
+            hashed_password = await asyncio.to_thread(security_utils.hash_password, user_data["password"])
             
             # Create new user
             new_user = User(
@@ -130,7 +131,9 @@ class AuthService:
                 )
             
             # Get user from database
-            user = db.query(User).filter(User.email == normalized_email).first()
+            user = await asyncio.to_thread(
+                lambda: db.query(User).filter(User.email == normalized_email).first()
+            )
             
             if not user:
                 security_utils.track_failed_login(normalized_email)
@@ -139,8 +142,8 @@ class AuthService:
                     detail="Invalid credentials"
                 )
             
-            # Verify password
-            if not security_utils.verify_password(password, user.hashed_password):
+            # Verify password (bcrypt is CPU-bound; keep it off the event loop)
+            if not await asyncio.to_thread(security_utils.verify_password, password, user.hashed_password):
                 security_utils.track_failed_login(normalized_email)
                 user.failed_login_attempts += 1
                 db.commit()
@@ -157,6 +160,10 @@ class AuthService:
                     detail="Account is deactivated"
                 )
             
+            # Transparently upgrade legacy (bcrypt) hashes to Argon2id
+            if security_utils.password_needs_rehash(user.hashed_password):
+                user.hashed_password = await asyncio.to_thread(security_utils.hash_password, password)
+            
             # Clear failed login attempts
             security_utils.clear_failed_logins(normalized_email)
             user.failed_login_attempts = 0
@@ -181,6 +188,11 @@ class AuthService:
             
             db.add(session)
             db.commit()
+            await security_utils.store_token_session(
+                access_token,
+                session.session_id,
+                settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            )
             
             logger.info(f"User authenticated successfully: {user.email}")
             
@@ -261,10 +273,14 @@ class AuthService:
         """Logout user by revoking token and session"""
         db = next(get_db())
         try:
+            # Verify once; the payload is reused for revocation and session lookup
+            payload = security_utils.verify_token(token)
+            
             # Revoke token
-            security_utils.revoke_token(token)
+            security_utils.revoke_token(token, payload)
             
-            # Deactivate session if provided
+            # Deactivate session if provided, else the one carried by or recorded for this token
+            session_id = session_id or (payload or {}).get("session_id") or await security_utils.get_token_session(token)
             if session_id:
                 session = db.query(UserSession).filter(
                     UserSession.session_id == session_id
@@ -309,7 +325,9 @@ class AuthService:
             
             # Get user
             user_id = payload.get("sub")
-            user = db.query(User).filter(User.id == int(user_id)).first()
+            user = await asyncio.to_thread(
+                lambda: db.query(User).filter(User.id == int(user_id)).first()
+            )
             
             if not user:
                 raise HTTPException(
@@ -411,7 +429,7 @@ class AuthService:
                 )
             
             # Update password
-            user.hashed_password = security_utils.hash_password(new_password)
+            user.hashed_password = await asyncio.to_thread(security_utils.hash_password, new_password)
             user.password_reset_token = None
             user.password_reset_expires = None
             user.failed_login_attempts = 0
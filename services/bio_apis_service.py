@@ -101,17 +101,20 @@ class BioinformaticsAPIsService:
     
     async def _rate_limit(self, api_name: str):
         """Implement rate limiting for API calls"""
-        current_time = time.time()
-        last_time = self.last_request_time.get(api_name, 0)
+        # Intervals only, so a monotonic clock read once; after sleeping, the request
+        # time is known without reading the clock again
+        current_time = time.monotonic()
+        last_time = self.last_request_time.get(api_name)
         
         rate_limit = self.rate_limits.get(api_name, {'requests': 1, 'window': 1})
         min_interval = rate_limit['window'] / rate_limit['requests']
         
-        time_since_last = current_time - last_time
-        if time_since_last < min_interval:
-            await asyncio.sleep(min_interval - time_since_last)
+        if last_time is not None and current_time - last_time < min_interval:
+            delay = min_interval - (current_time - last_time)
+            await asyncio.sleep(delay)
+            current_time += delay
         
-        self.last_request_time[api_name] = time.time()
+        self.last_request_time[api_name] = current_time
     
     async def close(self):
         """Close the session"""
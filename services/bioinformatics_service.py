@@ -10,7 +10,7 @@ except ImportError:
 import json
 import io
 import base64
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, BinaryIO
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 import asyncio
@@ -486,6 +486,20 @@ class BioinformaticsService:
     async def upload_dataset(self, user_id: int, file_data: bytes, file_name: str, 
                            metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Upload and validate gene expression dataset"""
+        return await self.upload_dataset_stream(user_id, io.BytesIO(file_data), file_name, metadata)
+    
+    def _read_expression_file(self, fileobj: BinaryIO, file_name: str) -> pd.DataFrame:
+        """Parse an expression matrix directly from a file-like object"""
+        if file_name.endswith('.csv'):
+            return pd.read_csv(fileobj, index_col=0)
+        elif file_name.endswith(('.xlsx', '.xls')):
+            return pd.read_excel(fileobj, index_col=0)
+        else:
+            raise ValueError("Unsupported file format")
+    
+    async def upload_dataset_stream(self, user_id: int, fileobj: BinaryIO, file_name: str,
+                                    metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Upload and validate gene expression dataset from a file-like object"""
         if not DATA_ANALYSIS_AVAILABLE:
             raise HTTPException(
                 status_code=status.HTTP_501_NOT_IMPLEMENTED,
@@ -499,8 +513,11 @@ class BioinformaticsService:
                     detail="Invalid file type. Supported types: CSV, XLSX, XLS"
                 )
             
-            # Validate file size
-            if not security_utils.validate_file_size(len(file_data)):
+            # Validate file size without reading the content
+            fileobj.seek(0, io.SEEK_END)
+            file_size = fileobj.tell()
+            fileobj.seek(0)
+            if not security_utils.validate_file_size(file_size):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"File size exceeds maximum limit of {settings.MAX_FILE_SIZE/1024/1024:.1f}MB"
@@ -508,13 +525,7 @@ class BioinformaticsService:
             
             # Parse the file
             try:
-                if file_name.endswith('.csv'):
-                    df = pd.read_csv(io.BytesIO(file_data), index_col=0)
-                elif file_name.endswith(('.xlsx', '.xls')):
-                    df = pd.read_excel(io.BytesIO(file_data), index_col=0)
-                else:
-                    raise ValueError("Unsupported file format")
-                    
+                df = await asyncio.to_thread(self._read_expression_file, fileobj, file_name)
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -538,7 +549,7 @@ class BioinformaticsService:
                 name=metadata.get("name", file_name),
                 description=metadata.get("description"),
                 file_name=file_name,
-                file_size=len(file_data),
+                file_size=file_size,
                 file_type=file_name.split('.')[-1].lower(),
                 num_genes=len(df.index),
                 num_samples=len(df.columns),
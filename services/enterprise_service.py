@@ -10,16 +10,16 @@ import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
+from contextvars import ContextVar
 from enum import Enum
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, case
 from fastapi import HTTPException, status
 import pandas as pd
 from collections import defaultdict
 import hashlib
 import secrets
 
-from models.database import get_db
 from models.user import User
 from models.enterprise import Team, TeamMember, Workspace, SharedAnalysis, APIKey, UsageLog, TeamRole
 from utils.logging import get_logger
@@ -29,6 +29,12 @@ from services.analysis_templates_service import analysis_templates_service
 
 logger = get_logger(__name__)
 
+# Request-scoped membership cache: user_id -> {team_id: TeamMember}.
+# Set by AuthorizationCacheMiddleware; None outside a request (no caching).
+request_membership_cache: ContextVar[Optional[Dict[int, Dict[int, TeamMember]]]] = ContextVar(
+    "request_membership_cache", default=None
+)
+
 class PermissionLevel(Enum):
     READ = "read"
     WRITE = "write"
@@ -80,7 +86,6 @@ class EnterpriseService:
     """Service for enterprise features and team collaboration"""
     
     def __init__(self):
-        self.db = next(get_db())
         self.active_sessions = {}
         self.usage_cache = defaultdict(list)
     
@@ -89,13 +94,30 @@ class EnterpriseService:
         """Initialize enterprise service"""
         logger.info("Enterprise service initialized")
     
+    def _get_membership(self, db: Session, team_id: int, user_id: int) -> Optional[TeamMember]:
+        """Get a user's team membership, loading all their memberships once per request"""
+        cache = request_membership_cache.get()
+        if cache is None:
+            return db.query(TeamMember).filter(
+                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
+            ).first()
+        
+        memberships = cache.get(user_id)
+        if memberships is None:
+            memberships = {
+                member.team_id: member
+                for member in db.query(TeamMember).filter(TeamMember.user_id == user_id).all()
+            }
+            cache[user_id] = memberships
+        return memberships.get(team_id)
+    
     # Team Management
-    async def create_team(self, creator_id: int, team_name: str, description: str = "", 
+    async def create_team(self, db: Session, creator_id: int, team_name: str, description: str = "", 
                          team_type: str = "research") -> Dict[str, Any]:
         """Create a new team"""
         try:
             # Check if team name already exists for this user
-            existing_team = self.db.query(Team).filter(
+            existing_team = db.query(Team).filter(
                 and_(Team.name == team_name, Team.creator_id == creator_id)
             ).first()
             
@@ -115,9 +137,9 @@ class EnterpriseService:
                 is_active=True
             )
             
-            self.db.add(team)
-            self.db.commit()
-            self.db.refresh(team)
+            db.add(team)
+            db.commit()
+            db.refresh(team)
             
             # Add creator as owner
             team_member = TeamMember(
@@ -128,11 +150,12 @@ class EnterpriseService:
                 added_by=creator_id
             )
             
-            self.db.add(team_member)
-            self.db.commit()
+            db.add(team_member)
+            db.commit()
             
             # Create default workspace
             workspace = await self.create_workspace(
+                db,
                 team_id=team.id,
                 creator_id=creator_id,
                 name="Default Workspace",
@@ -159,14 +182,12 @@ class EnterpriseService:
                 detail="Internal server error"
             )
     
-    async def invite_team_member(self, team_id: int, inviter_id: int, 
+    async def invite_team_member(self, db: Session, team_id: int, inviter_id: int, 
                                user_email: str, role: TeamRole) -> Dict[str, Any]:
         """Invite a user to join a team"""
         try:
             # Check if inviter has permission
-            inviter_membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == inviter_id)
-            ).first()
+            inviter_membership = self._get_membership(db, team_id, inviter_id)
             
             if not inviter_membership or inviter_membership.role not in [TeamRole.OWNER, TeamRole.ADMIN]:
                 raise HTTPException(
@@ -175,7 +196,7 @@ class EnterpriseService:
                 )
             
             # Find user by email
-            user = self.db.query(User).filter(User.email == user_email).first()
+            user = db.query(User).filter(User.email == user_email).first()
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -183,7 +204,7 @@ class EnterpriseService:
                 )
             
             # Check if user is already a member
-            existing_membership = self.db.query(TeamMember).filter(
+            existing_membership = db.query(TeamMember).filter(
                 and_(TeamMember.team_id == team_id, TeamMember.user_id == user.id)
             ).first()
             
@@ -202,8 +223,8 @@ class EnterpriseService:
                 added_by=inviter_id
             )
             
-            self.db.add(team_member)
-            self.db.commit()
+            db.add(team_member)
+            db.commit()
             
             # Log collaboration event
             await self._log_collaboration_event(
@@ -236,13 +257,11 @@ class EnterpriseService:
                 detail="Internal server error"
             )
     
-    async def get_team_members(self, team_id: int, requester_id: int) -> List[Dict[str, Any]]:
+    async def get_team_members(self, db: Session, team_id: int, requester_id: int) -> List[Dict[str, Any]]:
         """Get list of team members"""
         try:
             # Check if requester is a team member
-            requester_membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == requester_id)
-            ).first()
+            requester_membership = self._get_membership(db, team_id, requester_id)
             
             if not requester_membership:
                 raise HTTPException(
@@ -251,7 +270,7 @@ class EnterpriseService:
                 )
             
             # Get team members
-            members = self.db.query(TeamMember, User).join(
+            members = db.query(TeamMember, User).join(
                 User, TeamMember.user_id == User.id
             ).filter(TeamMember.team_id == team_id).all()
             
@@ -277,14 +296,12 @@ class EnterpriseService:
             )
     
     # Workspace Management
-    async def create_workspace(self, team_id: int, creator_id: int, 
+    async def create_workspace(self, db: Session, team_id: int, creator_id: int, 
                              name: str, description: str = "") -> Dict[str, Any]:
         """Create a new workspace"""
         try:
             # Check if user is team member
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == creator_id)
-            ).first()
+            membership = self._get_membership(db, team_id, creator_id)
             
             if not membership:
                 raise HTTPException(
@@ -302,9 +319,9 @@ class EnterpriseService:
                 is_active=True
             )
             
-            self.db.add(workspace)
-            self.db.commit()
-            self.db.refresh(workspace)
+            db.add(workspace)
+            db.commit()
+            db.refresh(workspace)
             
             logger.info(f"Workspace created: {workspace.name} (ID: {workspace.id})")
             
@@ -326,13 +343,11 @@ class EnterpriseService:
                 detail="Internal server error"
             )
     
-    async def get_team_workspaces(self, team_id: int, user_id: int) -> List[Dict[str, Any]]:
+    async def get_team_workspaces(self, db: Session, team_id: int, user_id: int) -> List[Dict[str, Any]]:
         """Get workspaces for a team"""
         try:
             # Check if user is team member
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, team_id, user_id)
             
             if not membership:
                 raise HTTPException(
@@ -340,8 +355,12 @@ class EnterpriseService:
                     detail="Access denied"
                 )
             
-            # Get workspaces
-            workspaces = self.db.query(Workspace).filter(
+            # Get workspaces with their analysis counts in one query
+            analysis_count = db.query(func.count(SharedAnalysis.id)).filter(
+                SharedAnalysis.workspace_id == Workspace.id
+            ).correlate(Workspace).scalar_subquery()
+            
+            workspaces = db.query(Workspace, analysis_count.label("analysis_count")).filter(
                 and_(Workspace.team_id == team_id, Workspace.is_active == True)
             ).all()
             
@@ -352,9 +371,9 @@ class EnterpriseService:
                     "description": workspace.description,
                     "creator_id": workspace.creator_id,
                     "created_at": workspace.created_at.isoformat(),
-                    "analysis_count": len(workspace.shared_analyses)
+                    "analysis_count": count
                 }
-                for workspace in workspaces
+                for workspace, count in workspaces
             ]
             
         except HTTPException:
@@ -367,15 +386,13 @@ class EnterpriseService:
             )
     
     # Shared Analysis Management
-    async def share_analysis(self, user_id: int, team_id: int, workspace_id: int,
+    async def share_analysis(self, db: Session, user_id: int, team_id: int, workspace_id: int,
                            analysis_type: str, analysis_results: Dict[str, Any],
                            title: str, description: str = "") -> Dict[str, Any]:
         """Share analysis results with team"""
         try:
             # Check permissions
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, team_id, user_id)
             
             if not membership:
                 raise HTTPException(
@@ -384,7 +401,7 @@ class EnterpriseService:
                 )
             
             # Verify workspace belongs to team
-            workspace = self.db.query(Workspace).filter(
+            workspace = db.query(Workspace).filter(
                 and_(Workspace.id == workspace_id, Workspace.team_id == team_id)
             ).first()
             
@@ -407,9 +424,9 @@ class EnterpriseService:
                 is_active=True
             )
             
-            self.db.add(shared_analysis)
-            self.db.commit()
-            self.db.refresh(shared_analysis)
+            db.add(shared_analysis)
+            db.commit()
+            db.refresh(shared_analysis)
             
             # Log collaboration event
             await self._log_collaboration_event(
@@ -444,20 +461,18 @@ class EnterpriseService:
                 detail="Internal server error"
             )
     
-    async def get_shared_analyses(self, workspace_id: int, user_id: int) -> List[Dict[str, Any]]:
+    async def get_shared_analyses(self, db: Session, workspace_id: int, user_id: int) -> List[Dict[str, Any]]:
         """Get shared analyses in a workspace"""
         try:
             # Verify user has access to workspace
-            workspace = self.db.query(Workspace).filter(Workspace.id == workspace_id).first()
+            workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
             if not workspace:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Workspace not found"
                 )
             
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == workspace.team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, workspace.team_id, user_id)
             
             if not membership:
                 raise HTTPException(
@@ -466,7 +481,7 @@ class EnterpriseService:
                 )
             
             # Get shared analyses
-            analyses = self.db.query(SharedAnalysis, User).join(
+            analyses = db.query(SharedAnalysis, User).join(
                 User, SharedAnalysis.user_id == User.id
             ).filter(
                 and_(SharedAnalysis.workspace_id == workspace_id, SharedAnalysis.is_active == True)
@@ -494,11 +509,11 @@ class EnterpriseService:
                 detail="Internal server error"
             )
     
-    async def get_shared_analysis_details(self, analysis_id: int, user_id: int) -> Dict[str, Any]:
+    async def get_shared_analysis_details(self, db: Session, analysis_id: int, user_id: int) -> Dict[str, Any]:
         """Get detailed shared analysis results"""
         try:
             # Get analysis and verify access
-            analysis = self.db.query(SharedAnalysis).filter(
+            analysis = db.query(SharedAnalysis).filter(
                 SharedAnalysis.id == analysis_id
             ).first()
             
@@ -509,9 +524,7 @@ class EnterpriseService:
                 )
             
             # Check team membership
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == analysis.team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, analysis.team_id, user_id)
             
             if not membership:
                 raise HTTPException(
@@ -520,7 +533,7 @@ class EnterpriseService:
                 )
             
             # Get creator info
-            creator = self.db.query(User).filter(User.id == analysis.user_id).first()
+            creator = db.query(User).filter(User.id == analysis.user_id).first()
             
             return {
                 "analysis_id": analysis.id,
@@ -544,14 +557,12 @@ class EnterpriseService:
             )
     
     # API Key Management
-    async def create_api_key(self, user_id: int, team_id: int, name: str, 
+    async def create_api_key(self, db: Session, user_id: int, team_id: int, name: str, 
                            permissions: List[str], expires_at: Optional[datetime] = None) -> Dict[str, Any]:
         """Create an API key for team use"""
         try:
             # Check if user can create API keys
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, team_id, user_id)
             
             if not membership or membership.role not in [TeamRole.OWNER, TeamRole.ADMIN]:
                 raise HTTPException(
@@ -579,9 +590,9 @@ class EnterpriseService:
                 is_active=True
             )
             
-            self.db.add(api_key_record)
-            self.db.commit()
-            self.db.refresh(api_key_record)
+            db.add(api_key_record)
+            db.commit()
+            db.refresh(api_key_record)
             
             logger.info(f"API key created: {name} for team {team_id}")
             
@@ -603,13 +614,13 @@ class EnterpriseService:
                 detail="Internal server error"
             )
     
-    async def validate_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
+    async def validate_api_key(self, db: Session, api_key: str) -> Optional[Dict[str, Any]]:
         """Validate API key and return permissions"""
         try:
             key_hash = hashlib.sha256(api_key.encode()).hexdigest()
             
             # Get API key record
-            api_key_record = self.db.query(APIKey).filter(
+            api_key_record = db.query(APIKey).filter(
                 and_(
                     APIKey.key_hash == key_hash,
                     APIKey.is_active == True,
@@ -622,7 +633,7 @@ class EnterpriseService:
             
             # Update last used
             api_key_record.last_used_at = datetime.utcnow()
-            self.db.commit()
+            db.commit()
             
             return {
                 "api_key_id": api_key_record.id,
@@ -636,13 +647,11 @@ class EnterpriseService:
             logger.error(f"Error validating API key: {e}")
             return None
     
-    async def get_team_api_keys(self, team_id: int, user_id: int) -> List[Dict[str, Any]]:
+    async def get_team_api_keys(self, db: Session, team_id: int, user_id: int) -> List[Dict[str, Any]]:
         """Get API keys for a team"""
         try:
             # Check permissions
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, team_id, user_id)
             
             if not membership or membership.role not in [TeamRole.OWNER, TeamRole.ADMIN]:
                 raise HTTPException(
@@ -651,7 +660,7 @@ class EnterpriseService:
                 )
             
             # Get API keys
-            api_keys = self.db.query(APIKey).filter(
+            api_keys = db.query(APIKey).filter(
                 and_(APIKey.team_id == team_id, APIKey.is_active == True)
             ).all()
             
@@ -677,13 +686,13 @@ class EnterpriseService:
             )
     
     # Usage Analytics
-    async def log_api_usage(self, api_key_id: int, endpoint: str, method: str,
+    async def log_api_usage(self, db: Session, api_key_id: int, endpoint: str, method: str,
                           execution_time: float, status_code: int, 
                           error_message: str = None) -> None:
         """Log API usage for analytics"""
         try:
             # Get API key info
-            api_key = self.db.query(APIKey).filter(APIKey.id == api_key_id).first()
+            api_key = db.query(APIKey).filter(APIKey.id == api_key_id).first()
             if not api_key:
                 return
             
@@ -700,8 +709,8 @@ class EnterpriseService:
                 timestamp=datetime.utcnow()
             )
             
-            self.db.add(usage_log)
-            self.db.commit()
+            db.add(usage_log)
+            db.commit()
             
             # Cache for real-time analytics
             self.usage_cache[api_key.team_id].append({
@@ -718,14 +727,12 @@ class EnterpriseService:
         except Exception as e:
             logger.error(f"Error logging API usage: {e}")
     
-    async def get_team_usage_analytics(self, team_id: int, user_id: int, 
+    async def get_team_usage_analytics(self, db: Session, team_id: int, user_id: int, 
                                      days: int = 30) -> Dict[str, Any]:
         """Get usage analytics for a team"""
         try:
             # Check permissions
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, team_id, user_id)
             
             if not membership:
                 raise HTTPException(
@@ -733,40 +740,37 @@ class EnterpriseService:
                     detail="Access denied"
                 )
             
-            # Get usage logs
+            # Aggregate in the database instead of loading every log row
             start_date = datetime.utcnow() - timedelta(days=days)
-            usage_logs = self.db.query(UsageLog).filter(
-                and_(
-                    UsageLog.team_id == team_id,
-                    UsageLog.timestamp >= start_date
-                )
-            ).all()
-            
-            # Calculate analytics
-            total_requests = len(usage_logs)
-            successful_requests = len([log for log in usage_logs if log.status_code < 400])
-            failed_requests = total_requests - successful_requests
+            period_filter = and_(UsageLog.team_id == team_id, UsageLog.timestamp >= start_date)
+            is_error = case((UsageLog.status_code >= 400, 1), else_=0)
             
-            avg_execution_time = np.mean([log.execution_time for log in usage_logs]) if usage_logs else 0
+            total_requests, failed_requests, avg_execution_time = db.query(
+                func.count(UsageLog.id),
+                func.coalesce(func.sum(is_error), 0),
+                func.avg(UsageLog.execution_time)
+            ).filter(period_filter).one()
+            successful_requests = total_requests - failed_requests
+            avg_execution_time = avg_execution_time or 0
             
             # Group by endpoint
-            endpoint_stats = defaultdict(lambda: {'count': 0, 'avg_time': 0, 'errors': 0})
-            for log in usage_logs:
-                endpoint_stats[log.endpoint]['count'] += 1
-                endpoint_stats[log.endpoint]['avg_time'] += log.execution_time
-                if log.status_code >= 400:
-                    endpoint_stats[log.endpoint]['errors'] += 1
-            
-            # Calculate averages
-            for endpoint in endpoint_stats:
-                if endpoint_stats[endpoint]['count'] > 0:
-                    endpoint_stats[endpoint]['avg_time'] /= endpoint_stats[endpoint]['count']
+            endpoint_stats = {
+                endpoint: {'count': count, 'avg_time': avg_time or 0, 'errors': errors or 0}
+                for endpoint, count, avg_time, errors in db.query(
+                    UsageLog.endpoint,
+                    func.count(UsageLog.id),
+                    func.avg(UsageLog.execution_time),
+                    func.sum(is_error)
+                ).filter(period_filter).group_by(UsageLog.endpoint)
+            }
             
             # Daily usage trend
-            daily_usage = defaultdict(int)
-            for log in usage_logs:
-                date_key = log.timestamp.date().isoformat()
-                daily_usage[date_key] += 1
+            usage_date = func.date(UsageLog.timestamp)
+            daily_usage = {
+                str(day): count
+                for day, count in db.query(usage_date, func.count(UsageLog.id))
+                .filter(period_filter).group_by(usage_date)
+            }
             
             return {
                 "team_id": team_id,
@@ -776,8 +780,8 @@ class EnterpriseService:
                 "failed_requests": failed_requests,
                 "success_rate": successful_requests / total_requests if total_requests > 0 else 0,
                 "avg_execution_time": avg_execution_time,
-                "endpoint_statistics": dict(endpoint_stats),
-                "daily_usage": dict(daily_usage)
+                "endpoint_statistics": endpoint_stats,
+                "daily_usage": daily_usage
             }
             
         except HTTPException:
@@ -790,15 +794,13 @@ class EnterpriseService:
             )
     
     # Collaborative Workflows
-    async def execute_collaborative_workflow(self, workflow_id: str, team_id: int, 
+    async def execute_collaborative_workflow(self, db: Session, workflow_id: str, team_id: int, 
                                            user_id: int, inputs: Dict[str, Any],
                                            workspace_id: int) -> Dict[str, Any]:
         """Execute a workflow collaboratively and share results"""
         try:
             # Check permissions
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, team_id, user_id)
             
             if not membership:
                 raise HTTPException(
@@ -814,6 +816,7 @@ class EnterpriseService:
             if execution.status == 'completed':
                 # Share results with team
                 shared_analysis = await self.share_analysis(
+                    db,
                     user_id=user_id,
                     team_id=team_id,
                     workspace_id=workspace_id,
@@ -889,14 +892,13 @@ class EnterpriseService:
         except Exception as e:
             logger.error(f"Error logging collaboration event: {e}")
     
-    async def get_team_activity(self, team_id: int, user_id: int, 
-                              days: int = 7) -> List[Dict[str, Any]]:
-        """Get recent team activity"""
+    async def get_team_activity(self, db: Session, team_id: int, user_id: int, 
+                              days: int = 7, cursor: Optional[str] = None,
+                              limit: int = 50) -> Dict[str, Any]:
+        """Get recent team activity, newest first, one keyset page at a time"""
         try:
             # Check permissions
-            membership = self.db.query(TeamMember).filter(
-                and_(TeamMember.team_id == team_id, TeamMember.user_id == user_id)
-            ).first()
+            membership = self._get_membership(db, team_id, user_id)
             
             if not membership:
                 raise HTTPException(
@@ -906,14 +908,33 @@ class EnterpriseService:
             
             # Get recent shared analyses
             start_date = datetime.utcnow() - timedelta(days=days)
-            recent_analyses = self.db.query(SharedAnalysis, User).join(
+            query = db.query(SharedAnalysis, User).join(
                 User, SharedAnalysis.user_id == User.id
             ).filter(
                 and_(
                     SharedAnalysis.team_id == team_id,
                     SharedAnalysis.created_at >= start_date
                 )
-            ).order_by(SharedAnalysis.created_at.desc()).limit(50).all()
+            )
+            
+            # Seek past the last row of the previous page: (created_at, id) < cursor
+            if cursor:
+                try:
+                    cursor_time, cursor_id = cursor.rsplit("_", 1)
+                    cursor_time, cursor_id = datetime.fromisoformat(cursor_time), int(cursor_id)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid cursor"
+                    )
+                query = query.filter(or_(
+                    SharedAnalysis.created_at < cursor_time,
+                    and_(SharedAnalysis.created_at == cursor_time, SharedAnalysis.id < cursor_id)
+                ))
+            
+            recent_analyses = query.order_by(
+                SharedAnalysis.created_at.desc(), SharedAnalysis.id.desc()
+            ).limit(limit).all()
             
             activities = []
             for analysis, user in recent_analyses:
@@ -926,7 +947,12 @@ class EnterpriseService:
                     'resource_id': analysis.id
                 })
             
-            return activities
+            next_cursor = None
+            if len(recent_analyses) == limit:
+                last = recent_analyses[-1][0]
+                next_cursor = f"{last.created_at.isoformat()}_{last.id}"
+            
+            return {"items": activities, "next_cursor": next_cursor}
             
         except HTTPException:
             raise
@@ -937,11 +963,40 @@ class EnterpriseService:
                 detail="Internal server error"
             )
     
-    def cleanup_expired_resources(self):
+    async def get_team_dashboard(self, db: Session, team_id: int, user_id: int, usage_days: int = 30,
+                                 activity_days: int = 7) -> Dict[str, Any]:
+        """Get members, workspaces, usage and activity for a team in one call"""
+        # Share one membership lookup across all four sections
+        cache_token = request_membership_cache.set({}) if request_membership_cache.get() is None else None
+        try:
+            if not self._get_membership(db, team_id, user_id):
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Access denied"
+                )
+            
+            # Sequential on purpose: the sections run synchronous queries on one Session,
+            # which must not be shared across concurrent tasks
+            members = await self.get_team_members(db, team_id, user_id)
+            workspaces = await self.get_team_workspaces(db, team_id, user_id)
+            usage = await self.get_team_usage_analytics(db, team_id, user_id, days=usage_days)
+            activity = await self.get_team_activity(db, team_id, user_id, days=activity_days)
+            
+            return {
+                "members": members,
+                "workspaces": workspaces,
+                "usage": usage,
+                "activity": activity["items"]
+            }
+        finally:
+            if cache_token is not None:
+                request_membership_cache.reset(cache_token)
+    
+    def cleanup_expired_resources(self, db: Session):
         """Clean up expired API keys and old logs"""
         try:
             # Deactivate expired API keys
-            expired_keys = self.db.query(APIKey).filter(
+            expired_keys = db.query(APIKey).filter(
                 and_(
                     APIKey.expires_at <= datetime.utcnow(),
                     APIKey.is_active == True
@@ -953,11 +1008,11 @@ class EnterpriseService:
             
             # Clean up old usage logs (keep last 90 days)
             cutoff_date = datetime.utcnow() - timedelta(days=90)
-            self.db.query(UsageLog).filter(
+            db.query(UsageLog).filter(
                 UsageLog.timestamp < cutoff_date
             ).delete()
             
-            self.db.commit()
+            db.commit()
             
             logger.info(f"Cleaned up {len(expired_keys)} expired API keys and old usage logs")
             
@@ -206,7 +206,8 @@ class LiteratureService:
     
     async def _extract_pdf_text(self, pdf_data: bytes) -> str:
         """Extract text from PDF using multiple methods"""
-        text = ""
+        # Collect pages and join once; repeated str += recopies the whole text per page
+        page_texts = []
         
         try:
             # Try pdfplumber first (better for complex layouts)
@@ -215,7 +216,7 @@ class LiteratureService:
                     for page in pdf.pages:
                         page_text = page.extract_text()
                         if page_text:
-                            text += page_text + "\n"
+                            page_texts.append(page_text)
             else:
                 # Skip pdfplumber if not available, go directly to PyPDF2
                 raise Exception("pdfplumber not available, using PyPDF2")
@@ -228,10 +229,11 @@ class LiteratureService:
                 for page in reader.pages:
                     page_text = page.extract_text()
                     if page_text:
-                        text += page_text + "\n"
+                        page_texts.append(page_text)
             except Exception as e:
                 raise Exception(f"Failed to extract text from PDF: {str(e)}")
         
+        text = "\n".join(page_texts)
         if not text.strip():
             raise Exception("No text could be extracted from PDF")
         
@@ -79,7 +79,7 @@ class ReportsService:
     
     async def generate_report(self, user_id: int, report_request: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a comprehensive report"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Collect data based on report type
@@ -113,7 +113,7 @@ class ReportsService:
                 report.file_size = os.path.getsize(file_path) if os.path.exists(file_path) else None
             
             # Update generation time
-            generation_time = time.time() - start_time
+            generation_time = time.perf_counter() - start_time
             report.generation_time = generation_time
             
             self.db.commit()
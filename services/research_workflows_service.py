@@ -28,6 +28,22 @@ from services.literature_service import literature_service
 
 logger = logging.getLogger(__name__)
 
+# orjson writes indented bytes directly and natively handles numpy values in results
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _export_json(data: Any) -> bytes:
+    """Serialize export data as indented UTF-8 JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(data, indent=2).encode('utf-8')
+
 @dataclass
 class ResearchWorkflow:
     """Research workflow definition"""
@@ -911,7 +927,7 @@ class ResearchWorkflowsService:
                     'end_time': execution.end_time.isoformat() if execution.end_time else None,
                     'results': execution.results
                 }
-                return json.dumps(export_data, indent=2).encode('utf-8')
+                return _export_json(export_data)
             
             elif format == 'zip':
                 # Create zip file with all results
@@ -927,12 +943,12 @@ class ResearchWorkflowsService:
                         'execution_id': execution.execution_id,
                         'results': execution.results
                     }
-                    zip_file.writestr('results.json', json.dumps(export_data, indent=2).encode('utf-8'))
+                    zip_file.writestr('results.json', _export_json(export_data))
                     
                     # Add individual template results
                     for template_id, result in execution.results.items():
                         filename = f"{template_id}_results.json"
-                        zip_file.writestr(filename, json.dumps(result, indent=2).encode('utf-8'))
+                        zip_file.writestr(filename, _export_json(result))
                 
                 buffer.seek(0)
                 return buffer.getvalue()
@@ -128,6 +128,115 @@ class TestAuthAPI:
         assert data["email"] == "test@example.com"
         assert data["full_name"] == "Test User"
     
+    def test_refresh_rate_limited_by_user(self, client):
+        """Test that refresh is rate limited per user rather than per IP"""
+        from datetime import datetime
+        from unittest.mock import AsyncMock
+        from api import auth as auth_api
+
+        allowed = {"allowed": True, "remaining": 59, "reset_time": datetime.utcnow()}
+        check = AsyncMock(return_value=allowed)
+        refresh_token = auth_api.security_utils.create_refresh_token({"sub": "42"})
+
+        with patch.object(auth_api.security_utils, 'check_rate_limit', check), \
+             patch.object(auth_api.auth_service, 'refresh_token', AsyncMock(return_value={"access_token": "new"})):
+            response = client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+        assert response.status_code == status.HTTP_200_OK
+        check.assert_awaited_once_with("auth:user:42", limit=60, window=60)
+
+    def test_get_current_user_cached_per_token(self):
+        """Test that repeat lookups for the same token skip the auth service"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from api import auth as auth_api
+        from utils.security import security_utils
+
+        token = security_utils.create_access_token({"sub": "1", "email": "test@example.com"})
+        user = MagicMock(id=1, email="test@example.com")
+        lookup = AsyncMock(return_value=user)
+
+        async def resolve_twice():
+            first = await auth_api._get_user_for_token(token)
+            second = await auth_api._get_user_for_token(token)
+            auth_api.invalidate_cached_user(token)
+            third = await auth_api._get_user_for_token(token)
+            return first, second, third
+
+        auth_api._user_cache.clear()
+        try:
+            with patch.object(auth_api.auth_service, 'get_current_user', lookup):
+                first, second, third = asyncio.run(resolve_twice())
+        finally:
+            auth_api._user_cache.clear()
+
+        assert isinstance(first, auth_api.UserSnapshot)
+        assert first.id == 1 and first.email == "test@example.com"
+        assert second is first
+        assert third is not first
+        assert lookup.await_count == 2
+
+    def test_cached_user_rejected_once_token_blacklisted(self):
+        """Test that a cached user is not served after the token is revoked elsewhere"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from fastapi import HTTPException
+        from api import auth as auth_api
+        from utils.security import security_utils
+
+        token = security_utils.create_access_token({"sub": "1", "email": "test@example.com"})
+        lookup = AsyncMock(return_value=MagicMock(id=1, email="test@example.com"))
+
+        auth_api._user_cache.clear()
+        try:
+            with patch.object(auth_api.auth_service, 'get_current_user', lookup):
+                asyncio.run(auth_api._get_user_for_token(token))
+                with patch.object(security_utils, 'is_token_blacklisted_async', AsyncMock(return_value=True)):
+                    with pytest.raises(HTTPException):
+                        asyncio.run(auth_api._get_user_for_token(token))
+        finally:
+            auth_api._user_cache.clear()
+
+        assert lookup.await_count == 1
+
+    def test_service_account_token_skips_user_lookup(self):
+        """Test that service account tokens resolve without loading a user"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from api import auth as auth_api
+        from utils.security import security_utils
+
+        token = security_utils.create_access_token({"sub": "health-probe"})
+        service_user = MagicMock(id=-1, email="health-probe")
+        lookup = AsyncMock()
+
+        with patch.object(auth_api, 'SERVICE_ACCOUNTS', frozenset({"health-probe"})), \
+             patch.dict(auth_api._service_users, {"health-probe": service_user}), \
+             patch.object(auth_api.auth_service, 'get_current_user', lookup):
+            user = asyncio.run(auth_api._get_user_for_token(token, allow_service_account=True))
+
+        assert user is service_user
+        lookup.assert_not_awaited()
+
+    def test_service_account_token_rejected_by_default(self):
+        """Test that service account tokens are refused outside read-only routes"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        from fastapi import HTTPException
+        from api import auth as auth_api
+        from utils.security import security_utils
+
+        token = security_utils.create_access_token({"sub": "health-probe"})
+        lookup = AsyncMock()
+
+        with patch.object(auth_api, 'SERVICE_ACCOUNTS', frozenset({"health-probe"})), \
+             patch.object(auth_api.auth_service, 'get_current_user', lookup):
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(auth_api._get_user_for_token(token))
+
+        assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
+        lookup.assert_not_awaited()
+
     def test_get_current_user_unauthorized(self, client):
         """Test getting current user without authentication"""
         response = client.get("/api/auth/me")
@@ -369,6 +478,21 @@ class TestAuthAPI:
         assert data["status"] == "healthy"
         assert "timestamp" in data
     
+    def test_health_check_payload_cached(self, client):
+        """Test that back-to-back health probes reuse the cached payload"""
+        from utils import health
+        
+        # Freeze the cache clock so both probes fall inside HEALTH_CACHE_TTL
+        health._health_cache.clear()
+        with patch.object(health, 'time') as mock_time:
+            mock_time.monotonic.return_value = 1000.0
+            first = client.get("/api/auth/health")
+            second = client.get("/api/auth/health")
+        health._health_cache.clear()
+        
+        assert first.status_code == status.HTTP_200_OK
+        assert first.content == second.content
+    
     def test_rate_limiting(self, client):
         """Test rate limiting on authentication endpoints"""
         # This test would need to be implemented based on the actual rate limiting logic
@@ -386,7 +510,33 @@ class TestAuthAPI:
         # The last few responses should be rate limited
         # This is a placeholder - actual implementation would depend on rate limiting setup
         assert len(responses) == 15
-    
+
+    def test_rate_limited_client_skips_redis(self, client):
+        """Test that an already rate-limited client is rejected without re-checking Redis"""
+        from datetime import datetime, timedelta
+        from unittest.mock import AsyncMock
+        from api import auth as auth_api
+
+        denied = {
+            "allowed": False,
+            "remaining": 0,
+            "reset_time": datetime.utcnow() + timedelta(seconds=60)
+        }
+        check = AsyncMock(return_value=denied)
+        user_data = {"email": "test@example.com", "password": "testpassword123"}
+
+        auth_api._rate_limited_clients.clear()
+        try:
+            with patch.object(auth_api.security_utils, 'check_rate_limit', check):
+                first = client.post("/api/auth/login", json=user_data)
+                second = client.post("/api/auth/login", json=user_data)
+        finally:
+            auth_api._rate_limited_clients.clear()
+
+        assert first.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert check.await_count == 1
+
     def test_cors_headers(self, client):
         """Test CORS headers on authentication endpoints"""
         response = client.options("/api/auth/login")
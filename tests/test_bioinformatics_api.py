@@ -502,7 +502,13 @@ class TestBioinformaticsAPI:
         response = client.get(f"/api/bio/gene-info/{gene_id}")
         
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
-    
+
+    def test_get_gene_info_batch_unauthorized(self, client):
+        """Test batch gene information retrieval without authentication"""
+        response = client.post("/api/bio/gene-info/batch", json={"gene_ids": ["BRCA1", "TP53"]})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
     def test_bioinformatics_health_check(self, client):
         """Test bioinformatics service health check"""
         response = client.get("/api/bio/health")
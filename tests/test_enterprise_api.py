@@ -0,0 +1,47 @@
+"""
+Unit tests for Enterprise API
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+from fastapi import status
+
+from api.main import app
+from api.auth import get_current_user
+from models.database import get_db
+
+class TestEnterpriseAPI:
+    """Test cases for Enterprise API endpoints"""
+
+    def test_create_team_creates_default_workspace(self, client):
+        """Test that creating a team also creates its default workspace with the same session"""
+        db = MagicMock()
+        owner = MagicMock(team_id=7, user_id=1)
+        # No team with this name yet; the creator's memberships include the new team
+        db.query.return_value.filter.return_value.first.return_value = None
+        db.query.return_value.filter.return_value.all.return_value = [owner]
+
+        team = MagicMock(id=7, description="Lab team", created_at=datetime(2024, 1, 1))
+        team.name = "Lab"
+        workspace = MagicMock(id=11, description="Default workspace for team collaboration",
+                              created_at=datetime(2024, 1, 1))
+        workspace.name = "Default Workspace"
+
+        app.dependency_overrides[get_current_user] = lambda: MagicMock(id=1)
+        app.dependency_overrides[get_db] = lambda: db
+
+        with patch('services.enterprise_service.Team', return_value=team), \
+             patch('services.enterprise_service.TeamMember', return_value=owner), \
+             patch('services.enterprise_service.Workspace', return_value=workspace) as workspace_model:
+            response = client.post(
+                "/api/enterprise/teams",
+                json={"name": "Lab", "description": "Lab team"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["team_id"] == 7
+        assert data["workspace_id"] == 11
+        assert workspace_model.call_args.kwargs["team_id"] == 7
+        db.add.assert_any_call(workspace)
@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 from typing import Optional
 import os
@@ -16,6 +16,9 @@ class Settings(BaseSettings):
         default="sqlite:///./biointel.db",
         env="DATABASE_URL"
     )
+    # Per-process pool; serverless deployments should keep this at 1/0 (or point at pgbouncer)
+    DB_POOL_SIZE: int = Field(default=5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, env="DB_MAX_OVERFLOW")
     
     # Security
     SECRET_KEY: str = Field(
@@ -27,8 +30,11 @@ class Settings(BaseSettings):
         env="JWT_SECRET_KEY"
     )
     JWT_ALGORITHM: str = Field(default="HS256", env="JWT_ALGORITHM")
+    PASSWORD_PEPPER: str = Field(default="", env="PASSWORD_PEPPER")  # Server-side secret mixed into Argon2 hashes
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7, env="REFRESH_TOKEN_EXPIRE_DAYS")
+    # Token subjects for internal callers (health probes, CI) that authenticate without a user row
+    SERVICE_ACCOUNTS: list = Field(default=[], env="SERVICE_ACCOUNTS")
     
     # Free AI Configuration
     USE_FREE_AI: bool = Field(default=True, env="USE_FREE_AI")
@@ -131,11 +137,12 @@ class Settings(BaseSettings):
     ENABLE_CACHING: bool = Field(default=True, env="ENABLE_CACHING")
     ENABLE_RATE_LIMITING: bool = Field(default=True, env="ENABLE_RATE_LIMITING")
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
-        extra = "ignore"  # Allow extra environment variables
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=True,
+        extra="ignore"  # Allow extra environment variables
+    )
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -0,0 +1,28 @@
+import time
+from datetime import datetime
+from typing import Any, Dict
+from fastapi.responses import Response
+from utils.serialization import dumps
+
+# Probes hit /health at 1-10 Hz; serve the same serialized payload for this many seconds
+HEALTH_CACHE_TTL = 1.0
+
+# service -> (built_at, serialized payload)
+_health_cache: Dict[str, tuple] = {}
+
+def health_response(service: str, **extra: Any) -> Response:
+    """Build a service health response, reusing the serialized body for HEALTH_CACHE_TTL"""
+    now = time.monotonic()
+    cached = _health_cache.get(service)
+    
+    if cached is None or now - cached[0] > HEALTH_CACHE_TTL:
+        payload = {
+            "service": service,
+            "status": "healthy",
+            **extra,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        cached = (now, dumps(payload))
+        _health_cache[service] = cached
+    
+    return Response(content=cached[1], media_type="application/json")
@@ -62,21 +62,25 @@ class APILogger:
         else:
             self.logger = logging.getLogger(name)
     
-    def info(self, message: str, **kwargs):
-        """Log info message with context"""
-        self.logger.info(message, **kwargs)
+    def info(self, message: str, *args, **kwargs):
+        """Log info message with context; args are interpolated lazily"""
+        self.logger.info(message, *args, **kwargs)
     
-    def warning(self, message: str, **kwargs):
-        """Log warning message with context"""
-        self.logger.warning(message, **kwargs)
+    def warning(self, message: str, *args, **kwargs):
+        """Log warning message with context; args are interpolated lazily"""
+        self.logger.warning(message, *args, **kwargs)
     
-    def error(self, message: str, **kwargs):
-        """Log error message with context"""
-        self.logger.error(message, **kwargs)
+    def error(self, message: str, *args, **kwargs):
+        """Log error message with context; args are interpolated lazily"""
+        self.logger.error(message, *args, **kwargs)
     
-    def debug(self, message: str, **kwargs):
-        """Log debug message with context"""
-        self.logger.debug(message, **kwargs)
+    def debug(self, message: str, *args, **kwargs):
+        """Log debug message with context; args are interpolated lazily"""
+        self.logger.debug(message, *args, **kwargs)
+    
+    def exception(self, message: str, *args, **kwargs):
+        """Log error message with the active exception's traceback"""
+        self.logger.exception(message, *args, **kwargs)
     
     def log_request(self, method: str, path: str, user_id: str = None, **kwargs):
         """Log API request"""
@@ -3,9 +3,11 @@ from typing import Optional, Dict, Any
 import hashlib
 import hmac
 import secrets
+import time
 import re
 import json
 import base64
+from collections import OrderedDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from utils.config import get_settings
@@ -26,6 +28,13 @@ except ImportError:
     PASSLIB_AVAILABLE = False
     print("⚠️  passlib not available - using built-in password hashing")
 
+try:
+    import argon2
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+    print("⚠️  argon2-cffi not available - using bcrypt password hashing")
+
 try:
     from cryptography.fernet import Fernet
     FERNET_AVAILABLE = True
@@ -40,8 +49,11 @@ except ImportError:
     EMAIL_VALIDATOR_AVAILABLE = False
     print("⚠️  email-validator not available - using basic email validation")
 
+EMAIL_PATTERN = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+
 try:
     import redis
+    import redis.asyncio as aioredis
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
@@ -50,26 +62,70 @@ except ImportError:
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Sliding-window rate limit executed atomically on the Redis server.
+# KEYS[1] = rate limit key; ARGV = now_ms, window_ms, limit, member
+# Returns {allowed, remaining, reset_ms}
+RATE_LIMIT_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return {1, limit - count - 1, window}
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+local reset = window
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+return {0, 0, reset}
+"""
+
 class SecurityUtils:
     """Security utilities for authentication, encryption, and validation"""
     
     def __init__(self):
         # Initialize password context
-        if PASSLIB_AVAILABLE:
+        if PASSLIB_AVAILABLE and ARGON2_AVAILABLE:
+            # Argon2id for new hashes; bcrypt hashes still verify and are flagged for rehash
+            self.pwd_context = CryptContext(
+                schemes=["argon2", "bcrypt"],
+                deprecated="auto",
+                argon2__type="ID",
+                argon2__time_cost=2,
+                argon2__memory_cost=19456,
+                argon2__parallelism=1
+            )
+        elif PASSLIB_AVAILABLE:
             self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         else:
             self.pwd_context = None
         
         # Initialize Redis client and memory cache
         self._memory_cache = {}  # Always initialize memory cache
+        # In-memory token -> session fallback; key -> (expires_at, session_id) in insertion order
+        self._token_sessions = OrderedDict()
         
         if REDIS_AVAILABLE:
             try:
                 self.redis_client = redis.from_url(settings.REDIS_URL)
             except Exception:
                 self.redis_client = None
+            try:
+                self.async_redis_client = aioredis.from_url(settings.REDIS_URL)
+                # Script SHA is computed once; EVALSHA falls back to EVAL on NOSCRIPT
+                self._rate_limit_script = self.async_redis_client.register_script(RATE_LIMIT_LUA)
+            except Exception:
+                self.async_redis_client = None
+                self._rate_limit_script = None
         else:
             self.redis_client = None
+            self.async_redis_client = None
+            self._rate_limit_script = None
         
         # Initialize encryption
         if FERNET_AVAILABLE:
@@ -90,9 +146,17 @@ class SecurityUtils:
             return Fernet.generate_key()
     
     # Password utilities
+    def _pepper_password(self, password: str) -> str:
+        """Mix the server-side pepper into a password before Argon2 hashing"""
+        if not settings.PASSWORD_PEPPER:
+            return password
+        return hmac.new(settings.PASSWORD_PEPPER.encode(), password.encode(), hashlib.sha256).hexdigest()
+    
     def hash_password(self, password: str) -> str:
-        """Hash password using bcrypt or fallback"""
+        """Hash password using Argon2id, bcrypt or fallback"""
         if PASSLIB_AVAILABLE and self.pwd_context:
+            if self.pwd_context.default_scheme() == "argon2":
+                return self.pwd_context.hash(self._pepper_password(password))
             return self.pwd_context.hash(password)
         else:
             # Fallback to basic hashing with salt
@@ -103,6 +167,9 @@ class SecurityUtils:
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify password against hash"""
         if PASSLIB_AVAILABLE and self.pwd_context:
+            # Legacy bcrypt hashes were created without the pepper
+            if self.pwd_context.identify(hashed_password) == "argon2":
+                plain_password = self._pepper_password(plain_password)
             return self.pwd_context.verify(plain_password, hashed_password)
         else:
             # Fallback verification
@@ -113,6 +180,15 @@ class SecurityUtils:
             except Exception:
                 return False
     
+    def password_needs_rehash(self, hashed_password: str) -> bool:
+        """Check if a stored hash uses a deprecated scheme or outdated parameters"""
+        if PASSLIB_AVAILABLE and self.pwd_context:
+            try:
+                return self.pwd_context.needs_update(hashed_password)
+            except Exception:
+                return False
+        return False
+    
     def validate_password_strength(self, password: str) -> Dict[str, Any]:
         """Validate password strength"""
         errors = []
@@ -206,21 +282,66 @@ class SecurityUtils:
             logger.warning(f"Token verification failed: {str(e)}")
             return None
     
-    def revoke_token(self, token: str):
-        """Revoke a token by adding it to blacklist"""
+    def _token_digest(self, token: str) -> str:
+        """Fixed-size SHA-256 key for a bearer token (tokens are already high-entropy)"""
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    async def store_token_session(self, token: str, session_id: str, ttl: int):
+        """Map a token to its session so lookups are a single GET"""
+        key = f"sess:{self._token_digest(token)}"
+        if self.async_redis_client:
+            try:
+                await self.async_redis_client.setex(key, ttl, session_id)
+                return
+            except Exception:
+                pass
+        
+        # Fallback entries expire like the Redis keys; every login uses the same TTL, so
+        # the oldest entries are at the front and expired ones are dropped from there
+        now = time.monotonic()
+        while self._token_sessions:
+            oldest_key, (expires_at, _) = next(iter(self._token_sessions.items()))
+            if expires_at > now:
+                break
+            del self._token_sessions[oldest_key]
+        self._token_sessions[key] = (now + ttl, session_id)
+    
+    async def get_token_session(self, token: str) -> Optional[str]:
+        """Get the session id stored for a token"""
+        key = f"sess:{self._token_digest(token)}"
+        if self.async_redis_client:
+            try:
+                session_id = await self.async_redis_client.get(key)
+                if session_id is not None:
+                    return session_id.decode() if isinstance(session_id, bytes) else session_id
+            except Exception:
+                pass
+        
+        entry = self._token_sessions.get(key)
+        if entry is None:
+            return None
+        expires_at, session_id = entry
+        if expires_at <= time.monotonic():
+            self._token_sessions.pop(key, None)
+            return None
+        return session_id
+    
+    def revoke_token(self, token: str, payload: Optional[Dict[str, Any]] = None):
+        """Revoke a token by adding it to blacklist (pass payload if already verified)"""
         if not self.redis_client:
             # Use memory cache
-            self._memory_cache[f"blacklist:{token}"] = "revoked"
+            self._memory_cache[f"blacklist:{self._token_digest(token)}"] = "revoked"
             return
             
         try:
-            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+            if payload is None:
+                payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
             exp = payload.get("exp")
             
             if exp:
                 # Add token to blacklist with expiration
                 self.redis_client.setex(
-                    f"blacklist:{token}",
+                    f"blacklist:{self._token_digest(token)}",
                     int(exp - datetime.utcnow().timestamp()),
                     "revoked"
                 )
@@ -228,19 +349,36 @@ class SecurityUtils:
             pass
         except Exception:
             # Fallback to memory cache
-            self._memory_cache[f"blacklist:{token}"] = "revoked"
+            self._memory_cache[f"blacklist:{self._token_digest(token)}"] = "revoked"
     
     def is_token_blacklisted(self, token: str) -> bool:
         """Check if token is blacklisted"""
+        # Tokens revoked before blacklist keys were hashed live under blacklist:<token>;
+        # keep checking that key until those entries expire (refresh tokens last 7 days)
+        key = f"blacklist:{self._token_digest(token)}"
+        legacy_key = f"blacklist:{token}"
         if not self.redis_client:
             # Use memory cache
-            return f"blacklist:{token}" in self._memory_cache
+            return key in self._memory_cache or legacy_key in self._memory_cache
             
         try:
-            return bool(self.redis_client.get(f"blacklist:{token}"))
+            return bool(self.redis_client.exists(key, legacy_key))
         except Exception:
             # Fallback to memory cache
-            return f"blacklist:{token}" in self._memory_cache
+            return key in self._memory_cache or legacy_key in self._memory_cache
+    
+    async def is_token_blacklisted_async(self, token: str) -> bool:
+        """Check if token is blacklisted without blocking the event loop"""
+        key = f"blacklist:{self._token_digest(token)}"
+        legacy_key = f"blacklist:{token}"
+        if self.async_redis_client:
+            try:
+                return bool(await self.async_redis_client.exists(key, legacy_key))
+            except Exception:
+                pass
+        
+        # Fallback to memory cache
+        return key in self._memory_cache or legacy_key in self._memory_cache
     
     # Data encryption utilities
     def encrypt_data(self, data: str) -> str:
@@ -268,9 +406,14 @@ class SecurityUtils:
     
     # Input validation utilities
     def validate_email(self, email: str) -> Dict[str, Any]:
-        """Validate email address"""
+        """Validate email address (syntax only - no DNS/MX lookups per request)"""
+        if not EMAIL_VALIDATOR_AVAILABLE:
+            if EMAIL_PATTERN.match(email):
+                return {"is_valid": True, "email": email, "normalized": email.lower()}
+            return {"is_valid": False, "error": "Invalid email address"}
+        
         try:
-            valid = validate_email(email)
+            valid = validate_email(email, check_deliverability=False)
             return {
                 "is_valid": True,
                 "email": valid.email,
@@ -306,24 +449,13 @@ class SecurityUtils:
         return file_size <= settings.MAX_FILE_SIZE
     
     # Rate limiting utilities
-    def check_rate_limit(self, identifier: str, limit: int = None, window: int = None) -> Dict[str, Any]:
-        """Check rate limit for identifier (IP, user, etc.)"""
+    async def check_rate_limit(self, identifier: str, limit: int = None, window: int = None) -> Dict[str, Any]:
+        """Check rate limit for identifier (IP, user, etc.) using a sliding window"""
         limit = limit or settings.RATE_LIMIT_REQUESTS
         window = window or settings.RATE_LIMIT_WINDOW
         
         # If Redis is not available, always allow (for development)
-        if not self.redis_client:
-            return {
-                "allowed": True,
-                "remaining": limit - 1,
-                "reset_time": datetime.utcnow() + timedelta(seconds=window)
-            }
-        
-        try:
-            key = f"rate_limit:{identifier}"
-            current = self.redis_client.get(key)
-        except Exception:
-            # If Redis connection fails, allow request
+        if not self._rate_limit_script:
             return {
                 "allowed": True,
                 "remaining": limit - 1,
@@ -331,34 +463,18 @@ class SecurityUtils:
             }
         
         try:
-            if current is None:
-                # First request
-                self.redis_client.setex(key, window, 1)
-                return {
-                    "allowed": True,
-                    "remaining": limit - 1,
-                    "reset_time": datetime.utcnow() + timedelta(seconds=window)
-                }
-            
-            current_count = int(current)
-            
-            if current_count >= limit:
-                return {
-                    "allowed": False,
-                    "remaining": 0,
-                    "reset_time": datetime.utcnow() + timedelta(seconds=self.redis_client.ttl(key))
-                }
-            
-            # Increment counter
-            self.redis_client.incr(key)
-            
+            now_ms = int(time.time() * 1000)
+            allowed, remaining, reset_ms = await self._rate_limit_script(
+                keys=[f"rate_limit:{identifier}"],
+                args=[now_ms, window * 1000, limit, f"{now_ms}-{secrets.token_hex(4)}"]
+            )
             return {
-                "allowed": True,
-                "remaining": limit - current_count - 1,
-                "reset_time": datetime.utcnow() + timedelta(seconds=self.redis_client.ttl(key))
+                "allowed": bool(allowed),
+                "remaining": int(remaining),
+                "reset_time": datetime.utcnow() + timedelta(milliseconds=int(reset_ms))
             }
         except Exception:
-            # If any Redis operation fails, allow the request
+            # If Redis connection fails, allow request
             return {
                 "allowed": True,
                 "remaining": limit - 1,
@@ -0,0 +1,21 @@
+import json
+from typing import Any
+
+# Optional fast JSON encoder, shared so every caller encodes with the same options
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps(data: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+def loads(data):
+    """Parse JSON from bytes or str, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)